@@ -0,0 +1,31 @@
+#!/usr/bin/python3
+""" Benchmark of BaseModel.from_dicts against BaseModel(**kwargs),
+the two ways of rebuilding objects from to_dict() dictionaries.
+
+Usage: ./benchmark_from_dicts.py [number of records, default 1000000]
+"""
+import sys
+from time import perf_counter
+from models.base_model import BaseModel
+from models.state import State
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+for cls in (BaseModel, State):
+    template = cls().to_dict()
+    template.pop("_sa_instance_state", None)
+    template["name"] = "California"
+    dicts = [dict(template, id=str(i)) for i in range(count)]
+
+    start = perf_counter()
+    for kwargs in dicts:
+        cls(**kwargs)
+    init_time = perf_counter() - start
+
+    start = perf_counter()
+    cls.from_dicts(dicts)
+    batch_time = perf_counter() - start
+
+    print("{}: {} records, __init__ {:.2f}s, from_dicts {:.2f}s, "
+          "{:.1f}x faster".format(cls.__name__, count, init_time,
+                                  batch_time, init_time / batch_time))
@@ -111,13 +111,12 @@ class HBNBCommand(cmd.Cmd):
         elif len(args_split) == 1:
             print("** instance id missing **")
             return
-        my_data = storage.all()
-        new_object = "{}.{}".format(args_split[0], args_split[1])
-        if new_object not in my_data.keys():
+        instance = storage.get(args_split[0], args_split[1])
+        if instance is None:
             print("** no instance found **")
             return
         else:
-            print("{}".format(my_data[new_object]))
+            print("{}".format(instance))
 
     def do_create(self, args):
         """Usage: create <class> <key 1>=<value 2> <key 2>=<value 2> ...
@@ -169,15 +168,15 @@ class HBNBCommand(cmd.Cmd):
             return
 
         instance_key = "{}.{}".format(model_name, instance_id)
+        instance = storage.get(model_name, instance_id)
 
-        if instance_key not in storage.all():
+        if instance is None:
             print("** no instance found **")
             return
 
         if attribute in ["id", "created_at", "updated_at"]:
             print("** cannot update '{}' attribute **".format(attribute))
             return
-        instance = storage.all()[instance_key]
 
         if not hasattr(instance, attribute):
             print("** attribute name missing **")
@@ -194,6 +193,7 @@ class HBNBCommand(cmd.Cmd):
             setattr(
                 instance, attribute,
                 type(getattr(instance, attribute))(value))
+            storage.new(instance)
             storage.save()
             success_formatted = "{}: {}.".format(instance_key, attribute)
             print("Update successful for " + success_formatted)
@@ -217,8 +217,9 @@ class HBNBCommand(cmd.Cmd):
             instance_id = args_split[1]
 
             instance_key = "{}.{}".format(class_name, instance_id)
-            if instance_key in storage.all():
-                del storage.all()[instance_key]
+            instance = storage.get(class_name, instance_id)
+            if instance is not None:
+                storage.delete(instance)
 
                 storage.save()
                 print("Instance {} deleted.".format(instance_key))
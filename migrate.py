@@ -0,0 +1,14 @@
+#!/usr/bin/python3
+""" Update the indexes of an existing database to the models, e.g.
+HBNB_MYSQL_USER=hbnb_dev HBNB_MYSQL_PWD=hbnb_dev_pwd \\
+HBNB_MYSQL_HOST=localhost HBNB_MYSQL_DB=hbnb_dev_db \\
+HBNB_TYPE_STORAGE=db ./migrate.py
+"""
+from models import storage
+
+if __name__ == "__main__":
+    changes = storage.migrate()
+    for name in changes["created"]:
+        print("created index", name)
+    for name in changes["dropped"]:
+        print("dropped index", name)
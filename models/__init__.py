@@ -5,10 +5,19 @@ instance for the application
 from os import getenv
 
 storage_type = getenv('HBNB_TYPE_STORAGE')
+# the engines keeping objects in SQL tables, where the models use
+# relationships instead of the storage indexes
+sql_storage = storage_type in ('db', 'sqlite')
 
 if storage_type == 'db':
     from models.engine.db_storage import DBStorage
     storage = DBStorage()
+elif storage_type == 'sqlite':
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage()
+elif storage_type == 'mmap':
+    from models.engine.mapped_storage import MappedStorage
+    storage = MappedStorage()
 else:
     from models.engine.file_storage import FileStorage
     storage = FileStorage()
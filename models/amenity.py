@@ -11,6 +11,6 @@ class Amenity(BaseModel, Base):
         name (str): The name of amenity.
     """
     __tablename__ = "amenities"
-    name = Column(String(128), nullable=False)
+    name = Column(String(128), nullable=False, index=True)
     place_amenities = relationship("Place", secondary="place_amenity",
                                    viewonly=False)
@@ -1,21 +1,31 @@
 #!/usr/bin/python3
 """Defines the BaseModel class."""
 from datetime import datetime
+from itertools import count
+import json
 from uuid import uuid4
 import models
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, String, DATETIME
+from sqlalchemy import Column, String, DATETIME, inspect
+from sqlalchemy.orm import configure_mappers
 
 Base = declarative_base()
+# stamps of the attribute assignments, see BaseModel.generation()
+assignments = count(1)
 
 
 class BaseModel:
     """Represents the BaseModel of the HBnB project."""
 
+    # the cached to_json() text, the names of the attributes assigned
+    # since the last save and the stamp of the last assignment live in
+    # slots, out of __dict__
+    __slots__ = ("__json", "__dirty", "__generation", "__dict__",
+                 "__weakref__")
+
     id = Column(String(60),
                 nullable=False,
-                primary_key=True,
-                unique=True)
+                primary_key=True)
     created_at = Column(DATETIME,
                         nullable=False,
                         default=datetime.utcnow())
@@ -37,7 +47,8 @@ class BaseModel:
         """
         if len(kwargs) != 0:
             for key, value in kwargs.items():
-                if key == "created_at" or key == "updated_at":
+                if key in ("created_at", "updated_at") and \
+                        not isinstance(value, datetime):
                     value = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
                 if key != "__class__":
                     setattr(self, key, value)
@@ -51,6 +62,117 @@ class BaseModel:
             self.id = str(uuid4())
             self.created_at = self.updated_at = datetime.now()
 
+    @classmethod
+    def from_dicts(cls, dicts):
+        """
+        Builds instances from to_dict() dictionaries in one batch.
+
+        This is the loading path of the storage engines: timestamps
+        are parsed with datetime.fromisoformat, attributes are copied
+        straight into the instance dictionary instead of one setattr
+        each, and an id or timestamp is only generated when missing.
+
+        Args:
+            dicts: iterable of dictionaries as returned by to_dict(),
+            their timestamps as strings or datetime objects.
+
+        Returns:
+            list: the new instances, in the order of dicts.
+        """
+        mapper = inspect(cls, raiseerr=False)
+        if mapper is not None:
+            configure_mappers()
+            new_instance = mapper.class_manager.new_instance
+        else:
+            def new_instance():
+                return cls.__new__(cls)
+        fromisoformat = datetime.fromisoformat
+        instances = []
+        for kwargs in dicts:
+            instance = new_instance()
+            attributes = instance.__dict__
+            attributes.update(kwargs)
+            attributes.pop("__class__", None)
+            for key in ("created_at", "updated_at"):
+                value = attributes.get(key)
+                if value is None:
+                    attributes[key] = datetime.now()
+                elif not isinstance(value, datetime):
+                    attributes[key] = fromisoformat(value)
+            if "id" not in attributes:
+                attributes["id"] = str(uuid4())
+            instances.append(instance)
+        return instances
+
+    def __setattr__(self, name, value):
+        """
+        Sets an attribute, stamps the instance with a new generation,
+        which outdates the cached to_json() text, and marks the
+        attribute dirty.
+
+        Outside db mode the storage is told about the first change
+        since the last save, so it queues a stored instance for the
+        next save, and about every change of an attribute it indexes
+        (those in storage.tracked), so it can move the instance in its
+        indexes. The state SQLAlchemy sets on mapped instances, loaded
+        ones included, is not an attribute and changes nothing.
+        """
+        if name == "_sa_instance_state":
+            super().__setattr__(name, value)
+            return
+        old = self.__dict__.get(name)
+        super().__setattr__(name, value)
+        # stamped after the value is set and before the dirty set is
+        # read, see to_json() and mark_clean()
+        BaseModel.__generation.__set__(self, next(assignments))
+        dirty = self.dirty_attributes()
+        first = not dirty
+        if first:
+            BaseModel.__dirty.__set__(self, dirty)
+        dirty.add(name)
+        if not models.sql_storage and (
+                first or old != value and name in models.storage.tracked):
+            models.storage.changed(self, name, old)
+
+    def dirty_attributes(self):
+        """
+        Returns the set of attribute names assigned since the instance
+        was last saved or loaded.
+        """
+        try:
+            return self.__dirty or set()
+        except AttributeError:
+            return set()
+
+    def generation(self):
+        """
+        Returns the stamp of the last attribute assignment, which
+        changes on every assignment, or 0 when there was none.
+        """
+        try:
+            return self.__generation
+        except AttributeError:
+            return 0
+
+    def mark_clean(self, generation=None):
+        """
+        Forgets the dirty attributes, called by the storage engines
+        once the instance is written.
+
+        A storage writing from another thread than the one assigning
+        passes the generation() read before the instance was written:
+        the instance then stays dirty when an attribute was assigned
+        since, as that change may not be written.
+
+        Returns:
+            bool: False when the instance has to be written again.
+        """
+        if generation is not None and self.generation() != generation:
+            return False
+        BaseModel.__dirty.__set__(self, None)
+        # an assignment made while clearing may have seen the old set
+        return generation is None or self.generation() == generation
+
     def save(self):
         """
         Updates the 'updated_at' attribute to the current date and time,
@@ -72,11 +194,40 @@ class BaseModel:
             dict: Dictionary containing the instance attributes.
         """
         result_dict = self.__dict__.copy()
+        result_dict.pop("_sa_instance_state", None)
         result_dict["updated_at"] = self.updated_at.isoformat()
         result_dict["created_at"] = self.created_at.isoformat()
         result_dict["__class__"] = self.__class__.__name__
         return result_dict
 
+    def to_json(self):
+        """
+        Returns the JSON text of to_dict(), as written by the file
+        storage engines.
+
+        The text is cached with the generation() it was built at and
+        used until an attribute of the instance is assigned, so saving
+        an unchanged instance costs no work, and a text built while
+        another thread assigns is never used afterwards. In-place
+        changes to a mutable attribute must be followed by an
+        assignment. SQLAlchemy refreshes instances without going
+        through assignments, so nothing is cached in db mode.
+
+        Returns:
+            str: JSON object text.
+        """
+        generation = self.generation()
+        try:
+            cached = self.__json
+        except AttributeError:
+            cached = None
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        text = json.dumps(self.to_dict())
+        if not models.sql_storage:
+            BaseModel.__json.__set__(self, (generation, text))
+        return text
+
     def __str__(self):
         """
         Returns a string representation of the instance.
@@ -3,9 +3,10 @@
 from models.base_model import BaseModel, Base
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, String
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import relationship
 from models.place import Place
+import models
 
 
 class City(BaseModel, Base):
@@ -15,8 +16,18 @@ class City(BaseModel, Base):
         name (str): name of city.
     """
     __tablename__ = "cities"
+    # a state's cities are listed by name: one index serves both
+    # the state_id lookup and the order
+    __table_args__ = (Index("ix_cities_state_id_name", "state_id", "name"),)
     name = Column(String(128), nullable=False)
     state_id = Column(String(60), ForeignKey('states.id'), nullable=False)
 
     places = relationship("Place", cascade='all, delete, delete-orphan',
                           backref="cities")
+
+    if not models.sql_storage:
+        @property
+        def places(self):
+            """getter for list of place instances located in the city"""
+            return list(models.storage.related(
+                Place, "city_id", self.id).values())
@@ -5,17 +5,24 @@ Contains the class DBStorage
 
 from models.amenity import Amenity
 from models.base_model import Base
+from models.engine.deferral import Deferral
 from models.city import City
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
-from os import getenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from os import getenv, register_at_fork
+from sqlalchemy import and_, create_engine, delete, insert, inspect, or_
+from sqlalchemy import func, text, update
+from sqlalchemy.orm import joinedload, scoped_session, selectinload
+from sqlalchemy.orm import sessionmaker
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+loaders = {"selectin": selectinload, "joined": joinedload}
 
 
 class DBStorage:
@@ -25,42 +32,335 @@ class DBStorage:
 
     def __init__(self):
         """Instantiate a DBStorage object"""
+        HBNB_ENV = getenv('HBNB_ENV')
+        self.__stats = {"saves": 0, "written": 0, "last_written": 0}
+        # bumped on every change made through this storage, so caches
+        # of what was read can tell they are stale
+        self.version = 0
+        self.__deferral = Deferral()
+        self.__engine = self.make_engine()
+        # a forked process opens its own connections, leaving the
+        # parent's ones alone
+        register_at_fork(after_in_child=partial(self.__engine.dispose,
+                                                close=False))
+        if HBNB_ENV == "test":
+            Base.metadata.drop_all(self.__engine)
+
+    def make_engine(self):
+        """create the engine of the MySQL database named by the
+        HBNB_MYSQL_* variables"""
         HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
         HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
-        HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
-        if HBNB_ENV == "test":
-            Base.metadata.drop_all(self.__engine)
+        return create_engine('mysql+mysqldb://{}:{}@{}/{}'.
+                             format(HBNB_MYSQL_USER,
+                                    HBNB_MYSQL_PWD,
+                                    HBNB_MYSQL_HOST,
+                                    HBNB_MYSQL_DB),
+                             **self.pool_options())
+
+    @staticmethod
+    def pool_options():
+        """connection pool settings read from the environment
+
+        HBNB_MYSQL_POOL_SIZE: connections kept open (default 5)
+        HBNB_MYSQL_MAX_OVERFLOW: extra connections under load (10)
+        HBNB_MYSQL_POOL_RECYCLE: seconds before a connection is
+            replaced, below MySQL's wait_timeout (3600)
+        HBNB_MYSQL_POOL_TIMEOUT: seconds to wait for a free connection (30)
+        HBNB_MYSQL_POOL_PRE_PING: test connections on checkout (1)
+        """
+        return {
+            "pool_size": int(getenv('HBNB_MYSQL_POOL_SIZE', '5')),
+            "max_overflow": int(getenv('HBNB_MYSQL_MAX_OVERFLOW', '10')),
+            "pool_recycle": int(getenv('HBNB_MYSQL_POOL_RECYCLE', '3600')),
+            "pool_timeout": int(getenv('HBNB_MYSQL_POOL_TIMEOUT', '30')),
+            "pool_pre_ping": getenv('HBNB_MYSQL_POOL_PRE_PING', '1')
+            not in ('0', 'false', 'False'),
+        }
+
+    def pool_status(self):
+        """return the connection pool statistics"""
+        pool = self.__engine.pool
+        return {"size": pool.size(), "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow()}
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def all(self, cls=None, load=None):
+        """query on the current database session
+
+        load names the relationships to eager load along with cls,
+        dotted for nested ones (e.g. "reviews.user"). It is a list of
+        names loaded with "selectin", or a dict mapping each name to
+        "selectin" or "joined", so templates walking the relationships
+        run a fixed number of queries instead of one per row.
+        """
         new_dict = {}
         for clss in classes:
-            if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+            if cls is None or cls is classes[clss] or cls == clss:
+                objs = self.__query(classes[clss], load=load).all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
+    def get(self, cls, id):
+        """return the object of class cls with this id, or None"""
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls is None:
+            return None
+        return self.__session.get(cls, id)
+
+    def stream(self, cls=None, where=None, order_by=None, limit=None,
+               batch_size=1000, load=None):
+        """yield objects batch_size rows at a time from a server-side
+        cursor instead of building a dict of the whole table
+
+        where maps attribute names to required values, order_by is an
+        attribute name or a list of them ("-name" sorts descending)
+        and limit caps the number of objects; all three run in SQL.
+        Without cls, only the classes having those attributes are read.
+        """
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        names = [name.lstrip("-") for name in order_by or ()] + \
+            list(where or ())
+        for clss in classes:
+            if cls is None and not all(hasattr(classes[clss], name)
+                                       for name in names):
+                continue
+            if cls is None or cls is classes[clss] or cls == clss:
+                if limit is not None and limit <= 0:
+                    return
+                query = self.__query(classes[clss], where, order_by, load)
+                if limit is not None:
+                    query = query.limit(limit)
+                for obj in query.yield_per(batch_size):
+                    if limit is not None:
+                        limit -= 1
+                    yield obj
+
+    def query(self, cls, order_by=None, limit=None, offset=0, where=None,
+              load=None, after=None):
+        """return a list of the objects of cls (a class or class name)
+
+        where, order_by and load are as for stream(); offset objects
+        are skipped and at most limit returned, all in SQL. Ties are
+        ordered by id so pages are stable.
+
+        When ordering by one attribute, after is the (value, id) of
+        the last object of the previous page: the page starts right
+        behind it through the index instead of counting an offset.
+        """
+        if isinstance(cls, str):
+            cls = classes[cls]
+        if order_by:
+            if isinstance(order_by, str):
+                order_by = [order_by]
+            order_by = list(order_by) + [
+                "-id" if order_by[-1].startswith("-") else "id"]
+        query = self.__query(cls, where, order_by, load)
+        if after is not None:
+            column = getattr(cls, order_by[0].lstrip("-"))
+            value, id = after
+            if order_by[0].startswith("-"):
+                query = query.filter(or_(column < value, and_(
+                    column == value, cls.id < id)))
+            else:
+                query = query.filter(or_(column > value, and_(
+                    column == value, cls.id > id)))
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def __query(self, cls, where=None, order_by=None, load=None):
+        """build the query for cls with its filters, order and loaders"""
+        query = self.__session.query(cls)
+        if where:
+            query = query.filter_by(**where)
+        if order_by:
+            if isinstance(order_by, str):
+                order_by = [order_by]
+            query = query.order_by(*[
+                getattr(cls, name[1:]).desc() if name.startswith("-")
+                else getattr(cls, name) for name in order_by])
+        if load:
+            query = query.options(*self.__loader_options(cls, load))
+        return query
+
+    @staticmethod
+    def __loader_options(cls, load):
+        """build the eager loading options for the relationships of cls"""
+        if not isinstance(load, dict):
+            load = dict.fromkeys(load, "selectin")
+        options = []
+        for path, strategy in load.items():
+            option = None
+            target = cls
+            for name in path.split("."):
+                attr = getattr(target, name)
+                if option is None:
+                    option = loaders[strategy](attr)
+                else:
+                    option = getattr(option, strategy + "load")(attr)
+                target = attr.property.mapper.class_
+            options.append(option)
+        return options
+
+    def preload(self):
+        """nothing to do: rows are read by the session of each thread
+        when queried, kept for parity with FileStorage"""
+
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
+        self.version += 1
+
+    def save(self, dirty_only=True):
+        """commit all changes of the current database session
+
+        The session only flushes new, modified and deleted objects,
+        so dirty_only is always in effect and only kept for parity
+        with FileStorage. Inside a deferred() block the commit is
+        postponed to the end.
+        """
+        if self.__deferral.depth:
+            self.__deferral.save = True
+            return
+        self.__commit()
+
+    def __commit(self):
+        """commit the current session and count the objects written,
+        rows written by the bulk methods included"""
+        session = self.__session
+        dirty = list(session.new) + list(session.dirty)
+        written = len(dirty) + len(session.deleted) + \
+            session.info.pop("bulk_written", 0)
+        session.commit()
+        for obj in dirty:
+            obj.mark_clean()
+        self.__stats["saves"] += 1
+        self.__stats["written"] += written
+        self.__stats["last_written"] = written
+        self.version += 1
+
+    def fingerprint(self, cls):
+        """return the number of objects of cls (a class or class name)
+        and their latest updated_at, which change with the table
+        whichever process writes to it"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        count, latest = self.__session.query(
+            func.count(cls.id), func.max(cls.updated_at)).one()
+        return count, latest
+
+    def save_stats(self):
+        """return the number of commits, of objects written in all and
+        of objects written by the last commit"""
+        return dict(self.__stats)
+
+    @contextmanager
+    def deferred(self):
+        """commit once when the block exits instead of on every save(),
+        or roll back if the block raises
+
+        Only the saves of the calling thread, which has a session of its
+        own, are deferred.
+        """
+        deferral = self.__deferral
+        deferral.depth += 1
+        try:
+            yield self
+        except BaseException:
+            deferral.depth -= 1
+            if not deferral.depth:
+                deferral.save = False
+                self.__session.info.pop("bulk_written", None)
+                self.__session.rollback()
+            raise
+        deferral.depth -= 1
+        if not deferral.depth and deferral.save:
+            deferral.save = False
+            self.__commit()
+
+    def bulk_new(self, objs, batch_size=10000):
+        """insert many objects with one executemany INSERT per class and
+        batch, bypassing the unit of work
 
-    def save(self):
-        """commit all changes of the current database session"""
-        self.__session.commit()
+        The objects are not added to the session and many-to-many
+        links such as Place.amenities are not written.
+        """
+        for cls, rows in self.__batches(objs, batch_size):
+            columns = [column.key for column in cls.__table__.columns]
+            self.__session.execute(insert(cls), [
+                {name: getattr(obj, name) for name in columns}
+                for obj in rows])
+            self.__bulk_written(len(rows))
+        self.save()
+
+    def bulk_update(self, objs, batch_size=10000, **attributes):
+        """set attributes on many objects with one executemany UPDATE
+        by primary key per class and batch"""
+        now = datetime.now()
+        for cls, rows in self.__batches(objs, batch_size):
+            self.__session.execute(update(cls), [
+                dict(attributes, id=obj.id, updated_at=now)
+                for obj in rows])
+            # objects of the session are counted as dirty by the commit
+            self.__bulk_written(len([obj for obj in rows
+                                     if obj not in self.__session]))
+            for obj in rows:
+                for name, value in attributes.items():
+                    setattr(obj, name, value)
+                obj.updated_at = now
+        self.save()
+
+    def bulk_delete(self, objs, batch_size=10000):
+        """delete many objects with one DELETE ... WHERE id IN per class
+        and batch
+
+        ORM cascades are not applied, so dependent rows (a state's
+        cities, a place's reviews...) must be deleted first.
+        """
+        for cls, rows in self.__batches(objs, batch_size):
+            self.__session.execute(
+                delete(cls).where(cls.id.in_([obj.id for obj in rows])),
+                execution_options={"synchronize_session": False})
+            self.__bulk_written(len(rows))
+            for obj in rows:
+                if obj in self.__session:
+                    self.__session.expunge(obj)
+        self.save()
+
+    def __bulk_written(self, count):
+        """count rows written outside the unit of work until the next
+        commit of the current session"""
+        info = self.__session.info
+        info["bulk_written"] = info.get("bulk_written", 0) + count
+
+    @staticmethod
+    def __batches(objs, batch_size):
+        """yield (class, list of objects) groups of at most batch_size"""
+        groups = {}
+        for obj in objs:
+            rows = groups.setdefault(type(obj), [])
+            rows.append(obj)
+            if len(rows) == batch_size:
+                yield type(obj), rows
+                groups[type(obj)] = []
+        for cls, rows in groups.items():
+            if rows:
+                yield cls, rows
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
             self.__session.delete(obj)
+            self.version += 1
 
     def reload(self):
         """reloads data from the database"""
@@ -68,8 +368,52 @@ class DBStorage:
         factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
         Session = scoped_session(factory)
         self.__session = Session
+        self.version += 1
+
+    def migrate(self):
+        """bring the tables and indexes of an existing database in line
+        with the models
+
+        Missing indexes are created. Indexes the models do not declare
+        are dropped when their columns lead the primary key or a
+        declared index, which makes them redundant (e.g. the unique
+        key on id, or cities.state_id next to (state_id, name)).
+        Returns the names of the indexes created and dropped.
+        """
+        Base.metadata.create_all(self.__engine)
+        inspector = inspect(self.__engine)
+        quote = self.__engine.dialect.identifier_preparer.quote
+        created, dropped = [], []
+        with self.__engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing = {index["name"]: index["column_names"]
+                            for index in inspector.get_indexes(table.name)}
+                declared = {index.name: [column.name
+                                         for column in index.columns]
+                            for index in table.indexes}
+                for index in table.indexes:
+                    if index.name not in existing:
+                        index.create(connection)
+                        created.append(index.name)
+                covering = list(declared.values()) + \
+                    [[column.name for column in table.primary_key]]
+                for name, columns in existing.items():
+                    if name in declared or None in columns or not any(
+                            other[:len(columns)] == columns
+                            for other in covering):
+                        continue
+                    statement = "DROP INDEX " + quote(name)
+                    if self.__engine.dialect.name == "mysql":
+                        statement += " ON " + quote(table.name)
+                    connection.execute(text(statement))
+                    dropped.append(name)
+        return {"created": created, "dropped": dropped}
 
     def close(self):
-        """ close method """
+        """ close method
+
+        Removes the calling thread's session so its connection goes
+        back to the pool; the next use opens a fresh session.
+        """
         if self.__session:
-            self.__session.close()
+            self.__session.remove()
@@ -0,0 +1,14 @@
+#!/usr/bin/python3
+""" Deferral module: the state of the deferred() blocks of a storage
+engine, kept per thread.
+"""
+import threading
+
+
+class Deferral(threading.local):
+    """ Depth of the deferred() blocks the current thread is in and
+    whether a save() was postponed by them. Other threads see their
+    own state, so their saves are not held back.
+    """
+    depth = 0
+    save = False
@@ -2,8 +2,13 @@
 """ FileStorage module for handling serialization
 and deserialization of objects to/from JSON.
 """
-import json
-from os import read
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from os import getenv, read
+from types import MappingProxyType
 from models.base_model import BaseModel
 from models.city import City
 from models.state import State
@@ -11,72 +16,789 @@ from models.user import User
 from models.amenity import Amenity
 from models.place import Place
 from models.review import Review
+from models.engine.deferral import Deferral
+from models.engine.journal import Journal
+from models.engine.write_behind import WriteBehind
+from models.engine.snapshot import formats
 import os.path
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+classes = {"BaseModel": BaseModel, "Amenity": Amenity, "City": City,
+           "Place": Place, "Review": Review, "State": State, "User": User}
+references = ("state_id", "city_id", "place_id", "user_id")
+
+
+def follows(obj, order, after):
+    """ Tell whether obj comes after the (value, id) position after in
+    the order of one attribute ("-name" for descending), then of id.
+    """
+    name = order.lstrip("-")
+    position = (getattr(obj, name, None), obj.id)
+    if order.startswith("-"):
+        return position < tuple(after)
+    return position > tuple(after)
 
 
 class FileStorage:
     """ FileStorage class to manage storage of objects in JSON format.
+
+    HBNB_FILE_FORMAT picks the snapshot format ("json", the default,
+    or the binary "pickle", see models.engine.snapshot). Objects read
+    from the snapshot are kept as records and only built into model
+    instances, a whole class at a time, when all() first asks for them.
+
+    Writes go to a temporary file that is synced to disk and renamed
+    over the snapshot, so a crash leaves either the old or the new
+    file. Several processes may share the files: writers hold an
+    exclusive advisory lock on file.json.lock and readers a shared
+    one, and a save first merges whatever another process saved since
+    this one last loaded.
+
+    HBNB_FILE_LAYOUT=sharded keeps one snapshot per class instead, in
+    file_store/<class>.json: a save rewrites only the files of the
+    classes it touches and a reload reads only the files that changed.
+
+    Threads may share a FileStorage: query(), stream() and fingerprint()
+    read the objects holding a mutex that new(), delete(), attribute
+    changes and reloads hold to change them. all() and related() return
+    live views, which a thread must copy, e.g. with list(), before
+    walking them.
     """
     def __init__(self):
         """ Initialize FileStorage instance with a default
         file path and an empty dictionary to store objects.
         """
-        self.__file_path = "file.json"
+        self.__format = formats[getenv('HBNB_FILE_FORMAT', 'json')]()
+        self.__file_path = self.__format.path
+        self.__shards = [None]
+        if getenv('HBNB_FILE_LAYOUT') == 'sharded':
+            self.__file_path = "file_store"
+            self.__shards = list(classes)
         self.__objects = {}
+        self.__records = {}
+        self.__by_class = {}
+        self.__refs = {}
+        self.__sorted = {}
+        self.tracked = set(references)
+        # bumped on every change, so caches of what was read can tell
+        # they are stale
+        self.version = 0
+        # changes per class name, see fingerprint()
+        self.__changes = {}
+        self.__fingerprints = {}
+        self.__journal = None
+        self.__pending = {}
+        # the pending objects a save is writing
+        self.__writing = {}
+        self.__compactor = None
+        self.__loaded = None
+        self.__deferral = Deferral()
+        self.__stats = {"saves": 0, "written": 0, "last_written": 0}
+        # guards the objects and indexes, held by readers walking them
+        # and by anything changing them
+        self.__mutex = threading.RLock()
+        # guards the advisory lock, held around file reads and writes
+        self.__lock_mutex = threading.RLock()
+        self.__lock_file = None
+        self.__lock_depth = 0
+        self.__saving = threading.Lock()
+        self.__writer = None
+        if getenv('HBNB_FILE_WRITE_BEHIND'):
+            self.__writer = WriteBehind(
+                self.__write_pending, float(getenv('HBNB_FILE_WRITE_BEHIND')))
+        if getenv('HBNB_FILE_JOURNAL'):
+            self.__journal = Journal(self.__file_path + ".log")
+            self.__compact_every = int(
+                getenv('HBNB_FILE_COMPACT_EVERY', '10000'))
 
-    def all(self, cls=None):
+    def all(self, cls=None, load=None):
         """ Return the dictionary of stored objects.
+
+        When cls (a class or class name) is given, a read-only view of
+        the objects of that class is returned from the per-class
+        index; every object is a BaseModel, so BaseModel gets them all.
+        Objects must be added and removed through new() and delete()
+        to keep the index in step.
+
+        load is accepted for parity with DBStorage and ignored: the
+        relationship properties already read from in-memory indexes.
         """
         if cls is not None:
-            if isinstance(cls, str):
-                cls = eval(cls)
-            filtered_objects = {}
-            for key, value in self.__objects.items():
-                if isinstance(value, cls):
-                    filtered_objects[key] = value
-            return filtered_objects
+            if not isinstance(cls, str):
+                cls = cls.__name__
+            if cls == "BaseModel":
+                self.__materialize()
+                return MappingProxyType(self.__objects)
+            self.__materialize(cls)
+            return MappingProxyType(self.__by_class.setdefault(cls, {}))
+        self.__materialize()
         return self.__objects
 
+    def get(self, cls, id):
+        """ Return the object of class cls (a class or class name)
+        with this id, or None, building only that one object if its
+        class was not loaded yet.
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        key = "{}.{}".format(cls, id)
+        obj = self.__objects.get(key)
+        if obj is None and cls in self.__records:
+            with self.__mutex:
+                obj = self.__objects.get(key)
+                record = self.__records.get(cls, {}).get(key)
+                if obj is None and record is not None:
+                    obj = classes[cls].from_dicts(
+                        [self.__format.decode(record)])[0]
+                    self.__put(key, obj)
+        return obj
+
+    def preload(self):
+        """ Build every object now rather than on first use, e.g. in
+        a server process about to fork its workers.
+        """
+        self.__materialize()
+
+    def __materialize(self, cls=None):
+        """ Build the model instances of the records still waiting
+        in __records, for class name cls or for every class.
+
+        A class leaves __records only once all its instances are in
+        place, so a thread finding it gone reads complete indexes and
+        the others wait on the mutex.
+        """
+        if cls is None and not self.__records or \
+                cls is not None and cls not in self.__records:
+            return
+        with self.__mutex:
+            for name in [cls] if cls is not None else list(self.__records):
+                records = list(self.__records.get(name, {}).items())
+                objs = classes[name].from_dicts(
+                    self.__format.decode(record) for key, record in records)
+                for (key, record), obj in zip(records, objs):
+                    self.__put(key, obj)
+                self.__records.pop(name, None)
+
+    def stream(self, cls=None, where=None, order_by=None, limit=None,
+               batch_size=None, load=None):
+        """ Yield the objects of cls, same arguments as DBStorage.stream.
+
+        where maps attribute names to required values, order_by is an
+        attribute name or a list of them ("-name" sorts descending)
+        and limit caps the number of objects. batch_size and load only
+        matter to DBStorage. Without cls, only the objects having those
+        attributes are read. The objects are collected before the first
+        one is yielded.
+        """
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        order_by = order_by or []
+        with self.__mutex:
+            objs = self.all(cls).values()
+            if where or order_by:
+                objs = list(objs)
+            else:
+                objs = list(islice(objs, limit))
+        if where or (order_by and cls is None):
+            names = [name.lstrip("-") for name in order_by]
+            objs = [obj for obj in objs
+                    if all(hasattr(obj, name) for name in names) and
+                    all(getattr(obj, name, None) == value
+                        for name, value in (where or {}).items())]
+        if order_by:
+            for name in reversed(order_by):
+                objs.sort(key=lambda obj: getattr(obj, name.lstrip("-")),
+                          reverse=name.startswith("-"))
+        for index, obj in enumerate(objs):
+            if limit is not None and index >= limit:
+                return
+            yield obj
+
+    def query(self, cls=None, order_by=None, limit=None, offset=0,
+              where=None, load=None, after=None):
+        """ Return a list of the objects of cls, same arguments as
+        DBStorage.query: where, order_by and load as for stream(),
+        offset objects skipped before the limit applies and after, the
+        (value, id) of the last object of the previous page when
+        ordering by one attribute.
+
+        Ordering a class by one attribute reads a sorted index of it,
+        built on first use and then kept up to date, so a page costs
+        offset + limit steps, or log(n) + limit from an after position,
+        instead of sorting the class. Ties are ordered by id so pages
+        are stable.
+        """
+        if cls is not None and not isinstance(cls, str):
+            cls = cls.__name__
+        if isinstance(order_by, (list, tuple)) and len(order_by) == 1:
+            order_by = order_by[0]
+        stop = None if limit is None else offset + limit
+        if cls in (None, "BaseModel") or not isinstance(order_by, str):
+            if order_by:
+                if isinstance(order_by, str):
+                    order_by = [order_by]
+                order_by = list(order_by) + [
+                    "-id" if order_by[-1].startswith("-") else "id"]
+            objs = self.stream(cls, where, order_by)
+            if after is not None:
+                objs = (obj for obj in objs
+                        if follows(obj, order_by[0], after))
+            return list(islice(objs, offset, stop))
+        with self.__mutex:
+            return self.__query_sorted(cls, order_by, offset, stop, where,
+                                       after)
+
+    def __query_sorted(self, cls, order_by, offset, stop, where, after):
+        """ Return the page of query() read from a sorted index, holding
+        the mutex.
+        """
+        entries = self.__sorted_index(cls, order_by.lstrip("-"))
+        descending = order_by.startswith("-")
+        start = len(entries) - 1 if descending else 0
+        if after is not None:
+            entry = self.__sort_key(after[0], cls + "." + after[1])
+            if descending:
+                start = bisect_left(entries, entry) - 1
+            else:
+                start = bisect_right(entries, entry)
+        if descending:
+            positions = range(start, -1, -1)
+        else:
+            positions = range(start, len(entries))
+        by_key = self.__by_class[cls]
+        objs = (by_key[entries[position][2]] for position in positions)
+        if where:
+            objs = (obj for obj in objs
+                    if all(getattr(obj, name, None) == value
+                           for name, value in where.items()))
+        return list(islice(objs, offset, stop))
+
+    def __sorted_index(self, cls, name):
+        """ Return the (has value, value, key) entries of the cls objects
+        sorted by attribute name, building them on first use.
+        """
+        self.__materialize(cls)
+        indexes = self.__sorted.setdefault(cls, {})
+        if name not in indexes:
+            indexes[name] = sorted(
+                self.__sort_key(getattr(obj, name, None), key)
+                for key, obj in self.__by_class.setdefault(cls, {}).items())
+            self.tracked.add(name)
+        return indexes[name]
+
+    @staticmethod
+    def __sort_key(value, key):
+        """ Return the sorted index entry of value, None first. """
+        return (value is not None, value, key)
+
+    @staticmethod
+    def __unsort(entries, entry):
+        """ Remove entry from sorted index entries, if there. """
+        index = bisect_left(entries, entry)
+        if index < len(entries) and entries[index] == entry:
+            del entries[index]
+
+    def related(self, cls, name, value):
+        """ Return a read-only view of the cls objects whose foreign
+        key attribute name (one of references) equals value.
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__materialize(cls)
+        return MappingProxyType(
+            self.__refs.setdefault((cls, name, value), {}))
+
+    def __put(self, key, obj):
+        """ Store obj under key in the storage dictionary and indexes. """
+        old = self.__objects.get(key)
+        if old is not None:
+            self.__unref(key, old)
+        cls = key.split(".")[0]
+        if cls in self.__records:
+            self.__records[cls].pop(key, None)
+        self.__objects[key] = obj
+        self.__by_class.setdefault(cls, {})[key] = obj
+        for name, entries in self.__sorted.get(cls, {}).items():
+            insort(entries, self.__sort_key(getattr(obj, name, None), key))
+        for name in references:
+            value = getattr(obj, name, None)
+            if value is not None:
+                self.__refs.setdefault((cls, name, value), {})[key] = obj
+
+    def __drop(self, key):
+        """ Remove key from the storage dictionary and indexes. """
+        self.__unref(key, self.__objects.pop(key))
+        self.__by_class[key.split(".")[0]].pop(key, None)
+
+    def __unref(self, key, obj):
+        """ Remove obj from the foreign key and sorted indexes. """
+        cls = key.split(".")[0]
+        for name, entries in self.__sorted.get(cls, {}).items():
+            self.__unsort(entries,
+                          self.__sort_key(getattr(obj, name, None), key))
+        for name in references:
+            value = getattr(obj, name, None)
+            if value is not None:
+                self.__refs.get((cls, name, value), {}).pop(key, None)
+
+    def changed(self, obj, name, old):
+        """ Called by BaseModel when attribute name of obj changed from
+        old: a stored obj is queued for the next save and moved in
+        the foreign key and sorted indexes.
+        """
+        cls = obj.__class__.__name__
+        key = cls + "." + str(getattr(obj, "id", None))
+        with self.__mutex:
+            if self.__objects.get(key) is not obj:
+                return
+            self.__pending[key] = obj
+            self.__touch(key)
+            value = getattr(obj, name, None)
+            entries = self.__sorted.get(cls, {}).get(name)
+            if entries is not None:
+                self.__unsort(entries, self.__sort_key(old, key))
+                insort(entries, self.__sort_key(value, key))
+            if name not in references:
+                return
+            if old is not None:
+                self.__refs.get((cls, name, old), {}).pop(key, None)
+            if value is not None:
+                self.__refs.setdefault((cls, name, value), {})[key] = obj
+
     def new(self, obj):
         """ Add a new object to the storage dictionary.
         """
         key = obj.__class__.__name__ + "." + obj.id
-        self.__objects[key] = obj
+        with self.__mutex:
+            self.__put(key, obj)
+            self.__pending[key] = obj
+            self.__touch(key)
+            self.version += 1
 
-    def save(self):
+    def save(self, dirty_only=True):
         """ Save the objects in the storage dictionary to a JSON file.
+
+        Only the dirty objects are written: those passed to new() or
+        delete(), or with an attribute assigned, since the last save.
+        Nothing is written when there are none. Without the journal
+        the snapshot file still has to be rewritten whole, but the
+        other objects reuse their cached to_json() text.
+
+        In journal mode the dirty objects are appended to the log, and
+        the log is folded into file.json by a background compaction
+        once it holds HBNB_FILE_COMPACT_EVERY records.
+
+        dirty_only=False writes a full snapshot even if nothing is
+        dirty, e.g. after changing a mutable attribute in place.
+
+        Inside a deferred() block the save is postponed to the end.
+
+        With HBNB_FILE_WRITE_BEHIND set to a delay in seconds, the write
+        is left to a background thread that makes it within that delay,
+        one write covering every save made meanwhile; flush() forces it.
+        """
+        if self.__deferral.depth:
+            self.__deferral.save = True
+            return
+        if self.__writer is not None and dirty_only:
+            self.__writer.request()
+            return
+        self.__write_pending(dirty_only)
+
+    def flush(self):
+        """ Make a save left to the write-behind thread now. """
+        if self.__writer is not None:
+            self.__writer.flush()
+
+    def __write_pending(self, dirty_only=True):
+        """ Write the dirty objects, see save(). """
+        with self.__saving:
+            pending, self.__pending = self.__pending, {}
+            self.__writing = pending
+            try:
+                self.__write(pending, dirty_only)
+            except BaseException:
+                # keep the changes for the next save
+                pending.update(self.__pending)
+                self.__pending = pending
+                raise
+            finally:
+                self.__writing = {}
+
+    def __write(self, pending, dirty_only):
+        """ Write the pending objects and count them. """
+        written = len(pending)
+        generations = {key: obj.generation()
+                       for key, obj in pending.items() if obj is not None}
+        if self.__journal:
+            with self.__locked(True):
+                self.__journal.append(
+                    (key, obj.to_json() if obj is not None else None)
+                    for key, obj in pending.items())
+            if not dirty_only:
+                written = len(self.__objects)
+                self.compact(wait=True)
+            elif self.__journal.records >= self.__compact_every:
+                self.compact()
+        elif pending or not dirty_only:
+            shards = self.__shards
+            if dirty_only:
+                touched = {self.__shard(key) for key in pending}
+                shards = [shard for shard in shards if shard in touched]
+            else:
+                written = len(self.__objects)
+            with self.__locked(True):
+                if self.__stamp() != self.__loaded:
+                    # another process saved since our last load: take
+                    # its changes, then put ours back on top
+                    self.reload()
+                    with self.__mutex:
+                        for key, obj in pending.items():
+                            self.__apply(key, obj)
+                for shard in shards:
+                    self.__write_snapshot(*self.__contents(shard), shard)
+                self.__loaded = self.__stamp()
+        for key, generation in generations.items():
+            obj = pending[key]
+            if not obj.mark_clean(generation) and \
+                    self.__objects.get(key) is obj:
+                # assigned to while being written, maybe too late
+                self.__pending.setdefault(key, obj)
+        for key in pending:
+            self.__touch(key)
+        self.__stats["saves"] += 1
+        self.__stats["written"] += written
+        self.__stats["last_written"] = written
+        self.version += 1
+
+    def fingerprint(self, cls):
+        """ Return the number of objects of cls (a class or class name),
+        their latest updated_at and the number of changes made to them,
+        computed once per version.
+
+        The changes count every new(), delete(), first assignment and
+        save of an object of cls, and every reload reading records of
+        cls, so the fingerprint moves even when updated_at does not.
+        It is counted by each process on its own.
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        stamp = (self.version, self.__changes.get(cls, 0))
+        cached, fingerprint = self.__fingerprints.get(cls, (None, None))
+        if cached != stamp:
+            with self.__mutex:
+                objs = self.all(cls).values()
+                fingerprint = (len(objs), max(
+                    (obj.updated_at for obj in objs), default=None),
+                    stamp[1])
+            self.__fingerprints[cls] = (stamp, fingerprint)
+        return fingerprint
+
+    def __touch(self, key):
+        """ Count a change to the class of the object stored under key,
+        see fingerprint().
+        """
+        cls = key.split(".")[0]
+        self.__changes[cls] = self.__changes.get(cls, 0) + 1
+
+    def save_stats(self):
+        """ Return the number of saves, of objects written in all and
+        of objects written by the last save.
+        """
+        return dict(self.__stats)
+
+    @contextmanager
+    def __locked(self, exclusive=False):
+        """ Hold the advisory lock on the storage files, exclusive for
+        writing or shared for reading. Nested uses keep the outer lock.
+
+        Only __mutex guards the objects: readers do not wait for the
+        files, and __mutex is never held while taking this lock.
+        """
+        with self.__lock_mutex:
+            if self.__lock_depth == 0 and fcntl is not None:
+                self.__lock_file = open(self.__file_path + ".lock", 'a')
+                fcntl.flock(self.__lock_file,
+                            fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self.__lock_depth += 1
+            try:
+                yield
+            finally:
+                self.__lock_depth -= 1
+                if self.__lock_depth == 0 and self.__lock_file is not None:
+                    self.__lock_file.close()
+                    self.__lock_file = None
+
+    def __shard(self, key):
+        """ Return the shard the object stored under key belongs to:
+        its class name in the sharded layout, else None.
+        """
+        return key.split(".")[0] if self.__shards[0] is not None else None
+
+    def __path(self, shard):
+        """ Return the snapshot file of a shard. """
+        if shard is None:
+            return self.__file_path
+        extension = os.path.splitext(self.__format.path)[1]
+        return os.path.join(self.__file_path, shard + extension)
+
+    def __contents(self, shard):
+        """ Return the objects and the records belonging to a shard. """
+        if shard is None:
+            return self.__objects, self.__records
+        return (self.__by_class.get(shard, {}),
+                {shard: self.__records.get(shard, {})})
+
+    def __keys(self, shard):
+        """ Return the keys of the objects and records of a shard. """
+        objects, records = self.__contents(shard)
+        keys = list(objects)
+        for cls_records in records.values():
+            keys.extend(cls_records)
+        return keys
+
+    def __write_snapshot(self, objects, records, shard=None):
+        """ Serialize objects, along with the records not built into
+        objects yet, into the snapshot file of shard, replacing it
+        atomically.
+        """
+        self.__publish(self.__dump_snapshot(objects, records, shard),
+                       self.__path(shard))
+
+    def __dump_snapshot(self, objects, records, shard=None):
+        """ Write the snapshot of shard into a temporary file synced to
+        disk and return its path for __publish().
         """
         dictionary = {}
-        with open(self.__file_path, 'w') as f:
-            for object in self.__objects.values():
-                key = object.__class__.__name__ + "." + object.id
-                dictionary[key] = object.to_dict()
-            json.dump(dictionary, f)
+        for cls_records in list(records.values()):
+            dictionary.update(cls_records)
+        for object in list(objects.values()):
+            key = object.__class__.__name__ + "." + object.id
+            dictionary[key] = self.__format.encode(object)
+        if shard is not None:
+            os.makedirs(self.__file_path, exist_ok=True)
+        tmp_path = "{}.{}.tmp".format(self.__path(shard), os.getpid())
+        try:
+            with open(tmp_path, 'wb') as f:
+                self.__format.dump(dictionary, f)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def __publish(self, tmp_path, path):
+        """ Rename a written snapshot over path and sync the directory
+        so the rename itself survives a crash.
+        """
+        os.replace(tmp_path, path)
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def compact(self, wait=False):
+        """ Fold the journal into a fresh file.json snapshot.
+
+        The live log is rotated and the objects are copied on the
+        calling thread, after replaying what other processes logged;
+        serialization happens on a background thread so new records
+        keep going to the new log meanwhile.
+        """
+        if not self.__journal:
+            return
+        if self.__compactor is None or not self.__compactor.is_alive():
+            with self.__locked(True):
+                self.reload()
+                self.__journal.rotate()
+                contents = []
+                with self.__mutex:
+                    for shard in self.__shards:
+                        objects, records = self.__contents(shard)
+                        contents.append((shard, dict(objects), {
+                            cls: dict(cls_records)
+                            for cls, cls_records in records.items()}))
+            self.__compactor = threading.Thread(
+                target=self.__compact_into, args=(contents,))
+            self.__compactor.start()
+        if wait:
+            self.__compactor.join()
+
+    def __compact_into(self, contents):
+        """ Write the snapshots of the (shard, objects, records)
+        contents then drop the rotated log they cover.
+        """
+        tmp_paths = [(self.__dump_snapshot(objects, records, shard),
+                      self.__path(shard))
+                     for shard, objects, records in contents]
+        with self.__locked(True):
+            for tmp_path, path in tmp_paths:
+                self.__publish(tmp_path, path)
+            self.__journal.discard_rotated()
+            self.__loaded = self.__stamp()
 
     def delete(self, obj=None):
         """Delete a given object from __objects, if it exists."""
         if obj is None:
             return
+        with self.__mutex:
+            try:
+                key = "{}.{}".format(type(obj).__name__, obj.id)
+                self.__drop(key)
+            except (AttributeError, KeyError):
+                return
+            self.__pending[key] = None
+            self.__touch(key)
+            self.version += 1
+
+    @contextmanager
+    def deferred(self):
+        """ Postpone every save() made inside the block to a single
+        save on exit. Nothing is saved when the block raises.
+
+        Only the saves of the calling thread are postponed; a save()
+        from another thread still writes every dirty object.
+        """
+        deferral = self.__deferral
+        deferral.depth += 1
         try:
-            del self.__objects["{}.{}".format(type(obj).__name__, obj.id)]
-        except (AttributeError, KeyError):
-            pass
+            yield self
+        finally:
+            deferral.depth -= 1
+        if not deferral.depth and deferral.save:
+            deferral.save = False
+            self.save()
+
+    def bulk_new(self, objs):
+        """ Add many objects and write them in one save. """
+        with self.deferred():
+            for obj in objs:
+                self.new(obj)
+            self.save()
+
+    def bulk_update(self, objs, **attributes):
+        """ Set attributes on many objects and write them in one save. """
+        now = datetime.now()
+        with self.deferred():
+            for obj in objs:
+                for name, value in attributes.items():
+                    setattr(obj, name, value)
+                obj.updated_at = now
+                self.new(obj)
+            self.save()
+
+    def bulk_delete(self, objs):
+        """ Delete many objects and write the result in one save. """
+        with self.deferred():
+            for obj in objs:
+                self.delete(obj)
+            self.save()
+
+    def __stamp(self):
+        """ Return the (inode, mtime, size) of each snapshot file and of
+        the rotated journal, used to tell whether they changed on disk.
+        """
+        paths = [self.__path(shard) for shard in self.__shards]
+        if self.__journal:
+            paths.append(self.__journal.rotated_path)
+        stamp = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+                stamp[path] = (st.st_ino, st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                stamp[path] = None
+        return stamp
 
     def reload(self):
         """ Load objects from a JSON file into the storage dictionary.
+
+        Nothing is parsed when file.json is unchanged since the last
+        load or save; in the sharded layout only the class files that
+        changed are read. In journal mode, when only the live log grew,
+        just the records appended since are replayed.
         """
-        classes = {
-                    'BaseModel': BaseModel, 'User': User, 'Place': Place,
-                    'State': State, 'City': City, 'Amenity': Amenity,
-                    'Review': Review
-                }
-        try:
-            with open(self.__file_path, 'r') as f:
-                my_data = json.load(f)
-                for key, value in my_data.items():
-                    self.all()[key] = classes[value['__class__']](**value)
-        except FileNotFoundError:
-            pass
+        stamp = self.__stamp()
+        if stamp == self.__loaded:
+            status = self.__journal.status() if self.__journal else 'current'
+            if status == 'current':
+                return
+        with self.__locked():
+            self.__load(self.__stamp())
+
+    def __load(self, stamp):
+        """ Read what changed on disk, holding the storage lock.
+
+        The files are read first, then applied holding the mutex.
+        """
+        if stamp == self.__loaded:
+            status = self.__journal.status() if self.__journal else 'current'
+            if status == 'current':
+                return
+            if status == 'grown':
+                records = list(self.__journal.replay(tail=True))
+                with self.__mutex:
+                    self.version += 1
+                    self.__replay(records)
+                return
+        loaded = self.__loaded or {}
+        contents = []
+        for shard in self.__shards:
+            path = self.__path(shard)
+            if stamp[path] == loaded.get(path):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    contents.append((shard, self.__format.load(f)))
+            except FileNotFoundError:
+                contents.append((shard, {}))
+        records = list(self.__journal.replay()) if self.__journal else []
+        with self.__mutex:
+            self.version += 1
+            for shard, my_data in contents:
+                self.__overlay(shard, my_data)
+            self.__replay(records)
+        self.__loaded = stamp
+
+    def __overlay(self, shard, my_data):
+        """ Replace the objects of shard by the records read from its
+        file, holding the mutex.
+        """
+        # unsaved changes of ours win over the file
+        unsaved = set(self.__pending) | set(self.__writing)
+        for key in self.__keys(shard):
+            if key not in my_data and key not in unsaved:
+                # deleted by another process
+                self.__apply(key, None)
+        for key, record in my_data.items():
+            if key in unsaved:
+                continue
+            if key in self.__objects:
+                self.__drop(key)
+            self.__records.setdefault(key.split(".")[0], {})[key] = record
+            self.__touch(key)
+
+    def __replay(self, records):
+        """ Apply journal records to the storage dictionary. """
+        for key, value in records:
+            if value is not None:
+                value = classes[value['__class__']].from_dicts([value])[0]
+            self.__apply(key, value)
+
+    def __apply(self, key, obj):
+        """ Store obj under key, or forget the key when obj is None. """
+        self.__touch(key)
+        if obj is None:
+            if key in self.__objects:
+                self.__drop(key)
+            self.__records.get(key.split(".")[0], {}).pop(key, None)
+        else:
+            self.__put(key, obj)
 
     def close(self):
         """call reload() method for deserializing the JSON file to objects"""
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+""" Journal module for the append-only change log kept
+next to the FileStorage JSON snapshot.
+"""
+import json
+import os
+
+
+class Journal:
+    """ Append-only log of change records.
+
+    Each line is a compact JSON list ``[key, dict]`` for an object that
+    was created or updated, or ``[key, null]`` for a deleted one.
+    Replaying the records in order on top of the snapshot rebuilds the
+    current state; replaying them twice is harmless.
+
+    The journal remembers how far into the live log it has read or
+    written (inode and byte offset), so a reader can pick up only the
+    records appended since.
+    """
+    def __init__(self, path):
+        """ Initialize a Journal writing to path. """
+        self.path = path
+        self.rotated_path = path + ".1"
+        self.records = 0
+        self.inode = None
+        self.offset = 0
+
+    def append(self, records):
+        """ Append (key, JSON text or None) records to the log and
+        sync them to disk.
+        """
+        lines = ["[{},{}]".format(json.dumps(key),
+                                  "null" if text is None else text)
+                 for key, text in records]
+        if not lines:
+            return
+        with open(self.path, 'ab') as f:
+            start = f.tell()
+            f.write(("\n".join(lines) + "\n").encode())
+            f.flush()
+            os.fsync(f.fileno())
+            inode = os.fstat(f.fileno()).st_ino
+            if start == self.offset and self.inode in (None, inode):
+                # nobody else wrote since our last read: stay current
+                self.inode = inode
+                self.offset = f.tell()
+        self.records += len(lines)
+
+    def status(self):
+        """ Compare the live log with what was last read or written.
+
+        Returns 'current' when nothing changed, 'grown' when records
+        were appended past the remembered offset and 'replaced' when
+        the log was truncated, rotated or recreated.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return 'current' if self.inode is None else 'replaced'
+        if self.inode is None:
+            return 'grown' if self.offset == 0 else 'replaced'
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            return 'replaced'
+        return 'current' if st.st_size == self.offset else 'grown'
+
+    def replay(self, tail=False):
+        """ Yield (key, dict or None) records.
+
+        By default the rotated log (left by an unfinished compaction)
+        and the whole live log are read; with tail only the live log
+        records past the remembered offset are.
+        """
+        if tail:
+            paths = [self.path]
+        else:
+            paths = [self.rotated_path, self.path]
+            self.records = self.offset = 0
+            self.inode = None
+        for path in paths:
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                continue
+            with f:
+                live = path == self.path
+                if live:
+                    self.inode = os.fstat(f.fileno()).st_ino
+                    f.seek(self.offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # torn or in-flight write, read it next time
+                        break
+                    if live:
+                        self.offset += len(line)
+                        self.records += 1
+                    try:
+                        key, value = json.loads(line)
+                    except ValueError:
+                        continue
+                    yield key, value
+
+    def rotate(self):
+        """ Move the live log aside so a snapshot can absorb it.
+
+        Returns False when a rotated log is still waiting to be
+        absorbed, in which case the live log is left in place.
+        """
+        if os.path.exists(self.rotated_path):
+            return False
+        try:
+            os.replace(self.path, self.rotated_path)
+        except FileNotFoundError:
+            pass
+        self.records = self.offset = 0
+        self.inode = None
+        return True
+
+    def discard_rotated(self):
+        """ Remove the rotated log once a snapshot covers it. """
+        try:
+            os.remove(self.rotated_path)
+        except FileNotFoundError:
+            pass
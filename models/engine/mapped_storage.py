@@ -0,0 +1,295 @@
+#!/usr/bin/python3
+""" MappedStorage module: a file storage engine for stores larger
+than memory, reading single records through a memory map.
+"""
+import json
+import mmap
+import os
+from itertools import islice
+from models.engine.file_storage import classes, follows
+
+
+class MappedStorage:
+    """ Storage engine keeping every record on its own line of an
+    append-only data file, ``key<TAB>json`` (an empty json part marks
+    a deletion), read through mmap.
+
+    Only a key -> (offset, length) index lives in memory, so get()
+    and an update through new()/save() touch one record whatever the
+    size of the store. Objects are built on first access and cached.
+    """
+    # attributes whose every change BaseModel reports, see changed()
+    tracked = frozenset()
+
+    def __init__(self):
+        """ Initialize MappedStorage with an empty index. """
+        self.__file_path = "file.dat"
+        self.__index = {}
+        self.__objects = {}
+        self.__pending = {}
+        self.__map = None
+        self.__inode = None
+        self.__size = 0
+        self.__live = 0
+        self.__stats = {"saves": 0, "written": 0, "last_written": 0}
+        self.version = 0
+        # changes per class name, see fingerprint()
+        self.__changes = {}
+        self.__fingerprints = {}
+
+    def all(self, cls=None, load=None):
+        """ Return a dictionary of the stored objects, of class cls
+        (a class or class name) only when given. Every matching
+        record is read, prefer get() for single objects.
+        """
+        if cls is not None and not isinstance(cls, str):
+            cls = cls.__name__
+        if cls == "BaseModel":
+            cls = None
+        prefix = cls + "." if cls is not None else ""
+        keys = [key for key in list(self.__index) + list(self.__objects)
+                if key.startswith(prefix)]
+        return {key: self.__object(key) for key in keys}
+
+    def get(self, cls, id):
+        """ Return the object of class cls with this id, or None. """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        key = "{}.{}".format(cls, id)
+        if key in self.__objects or key in self.__index:
+            return self.__object(key)
+        return None
+
+    def __object(self, key):
+        """ Return the object stored under key, building it from its
+        record on first access.
+        """
+        obj = self.__objects.get(key)
+        if obj is None:
+            offset, length = self.__index[key]
+            if self.__map is None or offset + length > len(self.__map):
+                self.__remap()
+            value = json.loads(self.__map[offset:offset + length])
+            obj = classes[value['__class__']].from_dicts([value])[0]
+            self.__objects[key] = obj
+        return obj
+
+    def preload(self):
+        """ Nothing to do: records are read on demand from the map,
+        which forked processes share anyway.
+        """
+
+    def stream(self, cls=None, where=None, order_by=None, limit=None,
+               batch_size=None, load=None):
+        """ Yield the objects of cls, same arguments as FileStorage. """
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        objs = [obj for obj in self.all(cls).values()
+                if all(getattr(obj, name, None) == value
+                       for name, value in (where or {}).items())]
+        for name in reversed(order_by or []):
+            objs.sort(key=lambda obj: getattr(obj, name.lstrip("-")),
+                      reverse=name.startswith("-"))
+        return iter(objs[:limit])
+
+    def query(self, cls=None, order_by=None, limit=None, offset=0,
+              where=None, load=None, after=None):
+        """ Return a list of the objects of cls, same arguments as
+        FileStorage.query.
+        """
+        if order_by:
+            if isinstance(order_by, str):
+                order_by = [order_by]
+            order_by = list(order_by) + [
+                "-id" if order_by[-1].startswith("-") else "id"]
+        stop = None if limit is None else offset + limit
+        objs = self.stream(cls, where, order_by)
+        if after is not None:
+            objs = (obj for obj in objs if follows(obj, order_by[0], after))
+        return list(islice(objs, offset, stop))
+
+    def related(self, cls, name, value):
+        """ Return the cls objects whose attribute name equals value. """
+        return {key: obj for key, obj in self.all(cls).items()
+                if getattr(obj, name, None) == value}
+
+    def changed(self, obj, name, old):
+        """ Called by BaseModel when attribute name of obj changed:
+        a cached obj is queued for the next save.
+        """
+        key = obj.__class__.__name__ + "." + str(getattr(obj, "id", None))
+        if self.__objects.get(key) is obj:
+            self.__pending[key] = obj
+            self.__touch(key)
+
+    def new(self, obj):
+        """ Add or update an object, written on the next save(). """
+        key = obj.__class__.__name__ + "." + obj.id
+        self.__objects[key] = obj
+        self.__pending[key] = obj
+        self.__touch(key)
+        self.version += 1
+
+    def delete(self, obj=None):
+        """ Delete an object, written on the next save(). """
+        if obj is None:
+            return
+        key = "{}.{}".format(type(obj).__name__, obj.id)
+        self.__objects.pop(key, None)
+        self.__pending.pop(key, None)
+        self.__touch(key)
+        self.version += 1
+        old = self.__index.pop(key, None)
+        if old is not None:
+            self.__live -= old[1]
+            self.__pending[key] = None
+
+    def save(self, dirty_only=True):
+        """ Append the records of the dirty objects (passed to new() or
+        delete(), or with an attribute assigned, since the last save),
+        then compact the data file when more than half of it is dead
+        records. dirty_only=False appends every cached object too.
+        """
+        pending, self.__pending = self.__pending, {}
+        if not dirty_only:
+            pending = dict(self.__objects, **pending)
+        self.__stats["saves"] += 1
+        self.__stats["written"] += len(pending)
+        self.__stats["last_written"] = len(pending)
+        for key in pending:
+            self.__touch(key)
+        self.version += 1
+        if not pending:
+            return
+        with open(self.__file_path, 'ab') as f:
+            start = offset = f.tell()
+            for key, obj in pending.items():
+                data = b"" if obj is None else obj.to_json().encode()
+                line = key.encode() + b"\t" + data + b"\n"
+                if obj is not None:
+                    self.__index_record(key, offset + len(line) -
+                                        len(data) - 1, len(data))
+                f.write(line)
+                offset += len(line)
+                if obj is not None:
+                    obj.mark_clean()
+            if start == self.__size:
+                self.__size = offset
+                self.__inode = os.fstat(f.fileno()).st_ino
+        if self.__size > 4096 and self.__live * 2 < self.__size:
+            self.compact()
+
+    def fingerprint(self, cls):
+        """ Return the number of objects of cls, their latest updated_at
+        and the number of changes made to them, same as
+        FileStorage.fingerprint.
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        stamp = (self.version, self.__changes.get(cls, 0))
+        cached, fingerprint = self.__fingerprints.get(cls, (None, None))
+        if cached != stamp:
+            objs = self.all(cls).values()
+            fingerprint = (len(objs), max(
+                (obj.updated_at for obj in objs), default=None), stamp[1])
+            self.__fingerprints[cls] = (stamp, fingerprint)
+        return fingerprint
+
+    def __touch(self, key):
+        """ Count a change to the class of the object stored under key,
+        see fingerprint().
+        """
+        cls = key.split(".")[0]
+        self.__changes[cls] = self.__changes.get(cls, 0) + 1
+
+    def save_stats(self):
+        """ Return the number of saves, of objects written in all and
+        of objects written by the last save.
+        """
+        return dict(self.__stats)
+
+    def __index_record(self, key, offset, length):
+        """ Point key at a record, keeping the live byte count. """
+        old = self.__index.get(key)
+        if old is not None:
+            self.__live -= old[1]
+        self.__index[key] = (offset, length)
+        self.__live += length
+
+    def compact(self):
+        """ Rewrite the data file with only the live records. """
+        self.save()
+        self.__remap()
+        tmp_path = self.__file_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            for key, (offset, length) in self.__index.items():
+                f.write(key.encode() + b"\t" +
+                        self.__map[offset:offset + length] + b"\n")
+        os.replace(tmp_path, self.__file_path)
+        objects = self.__objects
+        self.__rescan()
+        self.__objects.update(objects)
+
+    def __remap(self):
+        """ Map the current data file into memory. """
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        try:
+            with open(self.__file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    self.__map = mmap.mmap(f.fileno(), 0,
+                                           access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            pass
+
+    def __rescan(self):
+        """ Forget the index and read it again from the data file. """
+        self.__index = {}
+        self.__objects = {key: obj for key, obj in self.__objects.items()
+                          if key in self.__pending}
+        self.__inode = None
+        self.__size = self.__live = 0
+        self.reload()
+
+    def reload(self):
+        """ Index the records appended to the data file since the
+        last call, by scanning their keys without parsing them.
+        """
+        try:
+            st = os.stat(self.__file_path)
+        except FileNotFoundError:
+            return
+        if st.st_size < self.__size or \
+                self.__inode not in (None, st.st_ino):
+            self.__rescan()
+            return
+        if st.st_size == self.__size:
+            return
+        self.version += 1
+        self.__remap()
+        self.__inode = st.st_ino
+        data = self.__map
+        pos = self.__size
+        while pos < len(data):
+            end = data.find(b"\n", pos)
+            if end == -1:
+                # torn or in-flight write, read it next time
+                break
+            tab = data.find(b"\t", pos, end)
+            key = data[pos:tab].decode()
+            self.__touch(key)
+            if key not in self.__pending:
+                self.__objects.pop(key, None)
+            if end == tab + 1:
+                old = self.__index.pop(key, None)
+                if old is not None:
+                    self.__live -= old[1]
+            else:
+                self.__index_record(key, tab + 1, end - tab - 1)
+            pos = end + 1
+        self.__size = pos
+
+    def close(self):
+        """ Pick up records written by other processes. """
+        self.reload()
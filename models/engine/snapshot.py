@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+""" Snapshot module defining the file formats FileStorage can
+write its objects in, selected with HBNB_FILE_FORMAT.
+"""
+import json
+import pickle
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+class JSONSnapshot:
+    """ The default format: one JSON object mapping each key to the
+    instance's to_dict().
+
+    Objects are encoded with their cached to_json() text, which dump()
+    streams into the file without building the whole document.
+    """
+    path = "file.json"
+
+    def dump(self, records, f):
+        """ Write the {key: record} dictionary to the binary file f. """
+        f.write(b"{")
+        separator = b""
+        for key, record in records.items():
+            if not isinstance(record, str):
+                record = json.dumps(record)
+            f.write(separator + json.dumps(key).encode() + b": " +
+                    record.encode())
+            separator = b", "
+        f.write(b"}")
+
+    def load(self, f):
+        """ Read the {key: record} dictionary from the binary file f. """
+        return json.load(f)
+
+    def encode(self, obj):
+        """ Return the record stored for obj. """
+        return obj.to_json()
+
+    def decode(self, record):
+        """ Return the keyword arguments rebuilding a record's object. """
+        return record
+
+
+class PickleSnapshot:
+    """ A compact binary format written with pickle protocol 5.
+
+    Each record is a (created_at, updated_at, attributes) tuple, the
+    timestamps being integer microseconds since the epoch so loading
+    costs no date parsing. The file is trusted like file.json is.
+    """
+    path = "file.pickle"
+
+    def dump(self, records, f):
+        """ Write the {key: record} dictionary to the binary file f. """
+        pickle.dump(records, f, protocol=5)
+
+    def load(self, f):
+        """ Read the {key: record} dictionary from the binary file f. """
+        return pickle.load(f)
+
+    def encode(self, obj):
+        """ Return the record stored for obj. """
+        attributes = obj.to_dict()
+        del attributes["created_at"], attributes["updated_at"]
+        return ((obj.created_at - EPOCH) // MICROSECOND,
+                (obj.updated_at - EPOCH) // MICROSECOND,
+                attributes)
+
+    def decode(self, record):
+        """ Return the keyword arguments rebuilding a record's object. """
+        created_at, updated_at, attributes = record
+        kwargs = dict(attributes)
+        kwargs["created_at"] = EPOCH + created_at * MICROSECOND
+        kwargs["updated_at"] = EPOCH + updated_at * MICROSECOND
+        return kwargs
+
+
+formats = {"json": JSONSnapshot, "pickle": PickleSnapshot}
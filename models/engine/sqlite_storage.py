@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""
+Contains the class SQLiteStorage
+"""
+
+from models.engine.db_storage import DBStorage
+from os import getenv
+from sqlalchemy import create_engine, event
+
+
+class SQLiteStorage(DBStorage):
+    """DBStorage on a local SQLite database file
+
+    HBNB_SQLITE_PATH names the file (hbnb.db by default). Connections
+    use write-ahead logging, so readers never wait for the writer, and
+    the pragmas below, tuned for a read-heavy application.
+    """
+    pragmas = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "foreign_keys": "ON",
+        "busy_timeout": "5000",
+        "cache_size": "-65536",
+        "mmap_size": "268435456",
+        "temp_store": "MEMORY",
+    }
+
+    def make_engine(self):
+        """create the engine of the SQLite database file"""
+        engine = create_engine(
+            'sqlite:///{}'.format(getenv('HBNB_SQLITE_PATH', 'hbnb.db')),
+            connect_args={"check_same_thread": False})
+        event.listen(engine, "connect", self.set_pragmas)
+        return engine
+
+    @classmethod
+    def set_pragmas(cls, dbapi_connection, connection_record):
+        """apply the pragmas to a new connection"""
+        cursor = dbapi_connection.cursor()
+        for name, value in cls.pragmas.items():
+            cursor.execute("PRAGMA {}={}".format(name, value))
+        cursor.close()
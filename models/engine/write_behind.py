@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+""" WriteBehind module: a background writer coalescing the saves
+of FileStorage.
+"""
+import atexit
+import os
+import threading
+import time
+import traceback
+import weakref
+
+
+class WriteBehind:
+    """ Background thread calling write() at most max_delay seconds
+    after a request.
+
+    Requests made while a write is waiting are coalesced into it, so
+    a burst of saves costs one write. flush() writes synchronously and
+    is also run when the interpreter exits. A forked child process gets
+    a writer thread of its own.
+    """
+    def __init__(self, write, max_delay):
+        """ Start the writer thread for the write callable. """
+        self.max_delay = max_delay
+        self.__write = write
+        self.__requested = threading.Event()
+        self.__start()
+        atexit.register(self.flush)
+        ref = weakref.ref(self)
+        os.register_at_fork(
+            after_in_child=lambda: ref() is not None and ref().__start())
+
+    def __start(self):
+        """ Start the writer thread, with a fresh lock: threads do not
+        survive a fork and a lock they held would stay taken.
+        """
+        self.__lock = threading.Lock()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def request(self):
+        """ Ask for a write within max_delay seconds. """
+        self.__requested.set()
+
+    def pending(self):
+        """ Return True when a requested write has not happened yet. """
+        return self.__requested.is_set()
+
+    def flush(self):
+        """ Run the requested write now, if any. A failed write is
+        requested again.
+        """
+        with self.__lock:
+            if not self.__requested.is_set():
+                return
+            self.__requested.clear()
+            try:
+                self.__write()
+            except BaseException:
+                self.__requested.set()
+                raise
+
+    def __run(self):
+        """ Wait for requests, let the burst settle, then write. """
+        while True:
+            self.__requested.wait()
+            time.sleep(self.max_delay)
+            try:
+                self.flush()
+            except Exception:
+                traceback.print_exc()
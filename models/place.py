@@ -4,9 +4,7 @@ from sqlalchemy.ext.declarative import declarative_base
 from models.base_model import BaseModel, Base
 from sqlalchemy import Column, Table, String, Integer, Float, ForeignKey
 from sqlalchemy.orm import relationship
-from os import getenv
 import models
-import shlex
 
 place_amenity_pivot = Table("place_amenity", Base.metadata,
                           Column("place_id", String(60),
@@ -20,7 +18,7 @@ place_amenity_pivot = Table("place_amenity", Base.metadata,
 class Place(BaseModel, Base):
     """ Place class inherits from BaseModel """
     __tablename__ = "places"
-    name = Column(String(128), nullable=False)
+    name = Column(String(128), nullable=False, index=True)
     description = Column(String(1024))
     number_rooms = Column(Integer, nullable=False, default=0)
     number_bathrooms = Column(Integer, nullable=False, default=0)
@@ -28,29 +26,26 @@ class Place(BaseModel, Base):
     price_by_night = Column(Integer, nullable=False, default=0)
     latitude = Column(Float)
     longitude = Column(Float)
-    city_id = Column(String(60), ForeignKey("cities.id"), nullable=False)
-    user_id = Column(String(60), ForeignKey("users.id"), nullable=False)
+    city_id = Column(String(60), ForeignKey("cities.id"), nullable=False,
+                     index=True)
+    user_id = Column(String(60), ForeignKey("users.id"), nullable=False,
+                     index=True)
     reviews = relationship("Review", backref="place", cascade="delete")
     amenities = relationship("Amenity", secondary="place_amenity",
                              viewonly=False)
     amenity_ids = []
 
-    if getenv("HBNB_TYPE_STORAGE") == "db":
+    if models.sql_storage:
         reviews = relationship("Review", cascade='all, delete, delete-orphan',
                                backref="place")
     else:
         @property
         def reviews(self):
             """ Returns list of reviews.id """
-            var = models.storage.all()
-            my_lists = []
-            result = []
-            for key in var:
-                review = key.replace('.', ' ')
-                review = shlex.split(review)
-                if (review[0] == 'Review'):
-                    my_lists.append(var[key])
-            for elem in my_lists:
-                if (elem.place_id == self.id):
-                    result.append(elem)
-            return (result)
+            return list(models.storage.related(
+                "Review", "place_id", self.id).values())
+
+        @property
+        def user(self):
+            """ Returns the User owning the place """
+            return models.storage.get("User", self.user_id)
@@ -3,6 +3,7 @@
 from sqlalchemy.ext.declarative import declarative_base
 from models.base_model import BaseModel, Base
 from sqlalchemy import Column, Integer, String, ForeignKey, Float
+import models
 
 
 class Review(BaseModel, Base):
@@ -14,5 +15,13 @@ class Review(BaseModel, Base):
     """
     __tablename__ = "reviews"
     text = Column(String(1024), nullable=False)
-    place_id = Column(String(60), ForeignKey("places.id"), nullable=False)
-    user_id = Column(String(60), ForeignKey("users.id"), nullable=False)
+    place_id = Column(String(60), ForeignKey("places.id"), nullable=False,
+                      index=True)
+    user_id = Column(String(60), ForeignKey("users.id"), nullable=False,
+                     index=True)
+
+    if not models.sql_storage:
+        @property
+        def user(self):
+            """getter for the user who wrote the review"""
+            return models.storage.get("User", self.user_id)
@@ -10,17 +10,13 @@ from models.city import City
 class State(BaseModel, Base):
     """ State class inherits from BaseModel"""
     __tablename__ = "states"
-    name = Column(String(128), nullable=False)
+    name = Column(String(128), nullable=False, index=True)
     cities = relationship("City", cascade='all, delete, delete-orphan',
                           backref="state")
 
-    if models.storage_type != "db":
+    if not models.sql_storage:
         @property
         def cities(self):
             """getter for list of city instances related to the state"""
-            city_list = []
-            all_cities = models.storage.all(City)
-            for city in all_cities.values():
-                if city.state_id == self.id:
-                    city_list.append(city)
-            return city_list
+            return list(models.storage.related(
+                City, "state_id", self.id).values())
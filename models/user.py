@@ -5,6 +5,7 @@ from sqlalchemy import Column, String
 from sqlalchemy.orm import relationship
 from models.place import Place
 from models.review import Review
+import models
 
 
 class User(BaseModel, Base):
@@ -21,3 +22,16 @@ class User(BaseModel, Base):
                           backref="user")
     reviews = relationship("Review", cascade='all, delete, delete-orphan',
                            backref="user")
+
+    if not models.sql_storage:
+        @property
+        def places(self):
+            """getter for list of place instances owned by the user"""
+            return list(models.storage.related(
+                Place, "user_id", self.id).values())
+
+        @property
+        def reviews(self):
+            """getter for list of review instances written by the user"""
+            return list(models.storage.related(
+                Review, "user_id", self.id).values())
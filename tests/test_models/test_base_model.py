@@ -2,9 +2,11 @@
 """ unittest for models/base_model.py
 """
 import models
+import threading
 import unittest
 from datetime import datetime
 from time import sleep
+from unittest.mock import patch
 from models.base_model import BaseModel
 
 
@@ -60,6 +62,74 @@ class Test_BaseModel(unittest.TestCase):
         my_data = base_model.to_dict()
         self.assertEqual(type(my_data), dict)
 
+    def test_BaseModel_to_json_cached(self):
+        """ test to_json is cached until an attribute is assigned """
+        base_model = BaseModel()
+        text = base_model.to_json()
+        self.assertIs(text, base_model.to_json())
+        base_model.name = "Betty"
+        self.assertIsNot(text, base_model.to_json())
+        self.assertIn('"name": "Betty"', base_model.to_json())
+        self.assertNotIn("_BaseModel__json", base_model.__dict__)
+
+    def test_BaseModel_to_json_concurrent_assignment(self):
+        """ test a text built while another thread assigns is not kept """
+        base_model = BaseModel(name="old")
+        to_dict = BaseModel.to_dict
+
+        def assign_after_to_dict(self):
+            data = to_dict(self)
+            if data["name"] == "old":
+                thread = threading.Thread(
+                    target=setattr, args=(self, "name", "new"))
+                thread.start()
+                thread.join()
+            return data
+
+        with patch.object(BaseModel, "to_dict", assign_after_to_dict):
+            self.assertIn('"name": "old"', base_model.to_json())
+        self.assertIn('"name": "new"', base_model.to_json())
+
+    def test_BaseModel_mark_clean_generation(self):
+        """ test mark_clean keeps the attributes assigned since """
+        base_model = BaseModel()
+        generation = base_model.generation()
+        base_model.name = "Betty"
+        self.assertFalse(base_model.mark_clean(generation))
+        self.assertEqual({"id", "created_at", "updated_at", "name"},
+                         base_model.dirty_attributes())
+        self.assertTrue(base_model.mark_clean(base_model.generation()))
+        self.assertEqual(set(), base_model.dirty_attributes())
+
+    def test_BaseModel_dirty_attributes(self):
+        """ test assigned attributes are dirty until marked clean """
+        base_model = BaseModel()
+        self.assertIn("id", base_model.dirty_attributes())
+        base_model.mark_clean()
+        self.assertEqual(set(), base_model.dirty_attributes())
+        base_model.name = "Betty"
+        self.assertEqual({"name"}, base_model.dirty_attributes())
+        loaded = BaseModel.from_dicts([base_model.to_dict()])[0]
+        self.assertEqual(set(), loaded.dirty_attributes())
+
+    def test_BaseModel_from_dicts(self):
+        """ test from_dicts rebuilds the instances to_dict describes """
+        base_model = BaseModel()
+        base_model.name = "Betty"
+        loaded = BaseModel.from_dicts([base_model.to_dict()])[0]
+        self.assertEqual(BaseModel, type(loaded))
+        self.assertEqual(base_model.id, loaded.id)
+        self.assertEqual(base_model.created_at, loaded.created_at)
+        self.assertEqual(base_model.updated_at, loaded.updated_at)
+        self.assertEqual("Betty", loaded.name)
+        self.assertNotIn("__class__", loaded.__dict__)
+
+    def test_BaseModel_from_dicts_missing_id(self):
+        """ test from_dicts generates the missing id and timestamps """
+        loaded = BaseModel.from_dicts([{"name": "Betty"}])[0]
+        self.assertEqual(str, type(loaded.id))
+        self.assertTrue(isinstance(loaded.created_at, datetime))
+
 
 if __name__ == "__main__":
     unittest.main()
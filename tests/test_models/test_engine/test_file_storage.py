@@ -3,11 +3,18 @@
 Unitest for the FileStorage class
 """
 import os
+import shutil
+import sys
+import threading
+import time
 import unittest
+from unittest.mock import patch
 import models
 from models import storage
 from models.engine.file_storage import FileStorage
 from models.base_model import BaseModel
+from models.state import State
+from models.city import City
 
 
 class Test_FileStorage(unittest.TestCase):
@@ -47,6 +54,50 @@ class Test_FileStorage(unittest.TestCase):
         self.assertIn("BaseModel." + base_model.id, storage.all().keys())
         self.assertIn(base_model, storage.all().values())
 
+    def test_all_by_class(self):
+        """all(cls) returns a read-only view of one class"""
+        fs = FileStorage()
+        state = State()
+        base_model = BaseModel()
+        fs.new(state)
+        fs.new(base_model)
+        self.assertEqual(["State." + state.id], list(fs.all(State).keys()))
+        self.assertEqual(["State." + state.id], list(fs.all("State").keys()))
+        self.assertEqual(2, len(fs.all(BaseModel)))
+        with self.assertRaises(TypeError):
+            fs.all(State)["State.x"] = state
+        fs.delete(state)
+        self.assertEqual(0, len(fs.all("State")))
+
+    def test_related(self):
+        """related() follows new, delete and foreign key changes"""
+        fs = FileStorage()
+        state = State()
+        other = State()
+        city = City(state_id=state.id)
+        fs.new(city)
+        self.assertIn(city, fs.related(City, "state_id", state.id).values())
+        with patch.object(models, "storage", fs):
+            city.state_id = other.id
+        self.assertEqual(0, len(fs.related(City, "state_id", state.id)))
+        self.assertIn(city, fs.related("City", "state_id", other.id).values())
+        fs.delete(city)
+        self.assertEqual(0, len(fs.related(City, "state_id", other.id)))
+
+    def test_stream(self):
+        """stream filters, sorts and limits the objects of a class"""
+        fs = FileStorage()
+        for name in ("Texas", "Alaska", "Ohio"):
+            fs.new(State(name=name))
+        names = [state.name for state in fs.stream(State, order_by="name")]
+        self.assertEqual(["Alaska", "Ohio", "Texas"], names)
+        names = [state.name for state in
+                 fs.stream("State", order_by="-name", limit=2)]
+        self.assertEqual(["Texas", "Ohio"], names)
+        names = [state.name for state in
+                 fs.stream(State, where={"name": "Ohio"})]
+        self.assertEqual(["Ohio"], names)
+
     def test_save(self):
         """check if save method is working"""
 
@@ -58,11 +109,611 @@ class Test_FileStorage(unittest.TestCase):
             self.assertIn("BaseModel." + base_model.id, save_text)
         self.assertIsNotNone(models.engine.file_storage.FileStorage().save)
 
+    def test_query(self):
+        """query pages through a class in the order of an attribute"""
+        fs = FileStorage()
+        states = [State(name=name) for name in ("c", "a", "d", "b")]
+        fs.bulk_new(states)
+        self.assertEqual(["b", "c"], [state.name for state in fs.query(
+            State, order_by="name", limit=2, offset=1)])
+        self.assertEqual(["d", "c"], [state.name for state in fs.query(
+            "State", order_by="-name", limit=2)])
+        with patch.object(models, "storage", fs):
+            states[1].name = "e"
+        fs.delete(states[3])
+        self.assertEqual(["c", "d", "e"], [state.name for state in fs.query(
+            "State", order_by="name")])
+        self.assertEqual(["e"], [state.name for state in fs.query(
+            "State", order_by="name", where={"id": states[1].id})])
+
+    def test_query_after(self):
+        """query starts a page right after a (value, id) position"""
+        fs = FileStorage()
+        states = [State(name=name) for name in ("b", "a", "b", "c")]
+        fs.bulk_new(states)
+        ordered = fs.query(State, order_by="name")
+        last = ordered[1]
+        self.assertEqual(ordered[2:], fs.query(
+            State, order_by="name", after=(last.name, last.id)))
+        self.assertEqual(ordered[:2][::-1], fs.query(
+            State, order_by="-name", after=(ordered[2].name,
+                                            ordered[2].id)))
+        self.assertEqual(ordered[2:3], fs.query(
+            "BaseModel", order_by="name", limit=1,
+            after=(last.name, last.id)))
+
+    def test_version(self):
+        """version changes on new, save, delete and reloaded changes"""
+        fs = FileStorage()
+        other = FileStorage()
+        other.reload()
+        versions = [fs.version]
+        base_model = BaseModel()
+        fs.new(base_model)
+        versions.append(fs.version)
+        fs.save()
+        versions.append(fs.version)
+        fs.delete(base_model)
+        versions.append(fs.version)
+        self.assertEqual(versions, sorted(set(versions)))
+        version = other.version
+        other.reload()
+        self.assertGreater(other.version, version)
+        version = other.version
+        other.reload()
+        self.assertEqual(version, other.version)
+
+    def test_fingerprint(self):
+        """fingerprint counts a class and finds its latest update"""
+        fs = FileStorage()
+        self.assertEqual((0, None), fs.fingerprint(State)[:2])
+        states = [State(name="a"), State(name="b")]
+        fs.bulk_new(states)
+        latest = max(state.updated_at for state in states)
+        self.assertEqual((2, latest), fs.fingerprint("State")[:2])
+        fs.delete(states[0])
+        self.assertEqual(1, fs.fingerprint("State")[0])
+
+    def test_fingerprint_rename(self):
+        """a change leaving updated_at as it was moves the fingerprint,
+        here and in a process reloading it"""
+        fs = FileStorage()
+        state = State(name="a")
+        fs.new(state)
+        fs.save()
+        other = FileStorage()
+        other.reload()
+        before, other_before = fs.fingerprint(State), other.fingerprint(State)
+        self.assertEqual(before, fs.fingerprint(State))
+        with patch.object(models, "storage", fs):
+            state.name = "b"
+            fs.new(state)
+            fs.save()
+        self.assertNotEqual(before, fs.fingerprint(State))
+        other.reload()
+        self.assertNotEqual(other_before, other.fingerprint(State))
+        self.assertEqual(before[:2], other.fingerprint(State)[:2])
+
+    def test_bulk(self):
+        """bulk_new, bulk_update and bulk_delete write the file once"""
+        fs = FileStorage()
+        objs = [BaseModel(name="s") for i in range(3)]
+        with patch.object(fs, "_FileStorage__write_snapshot",
+                          wraps=fs._FileStorage__write_snapshot) as write:
+            fs.bulk_new(objs)
+            fs.bulk_update(objs[:2], name="t")
+            fs.bulk_delete(objs[2:])
+        self.assertEqual(3, write.call_count)
+        other = FileStorage()
+        other.reload()
+        self.assertEqual(["t", "t"],
+                         [obj.name for obj in other.all(BaseModel).values()])
+
+    def test_deferred(self):
+        """save() calls inside deferred() turn into a single save"""
+        fs = FileStorage()
+        with patch.object(fs, "_FileStorage__write_snapshot") as write:
+            with fs.deferred():
+                for i in range(3):
+                    fs.new(BaseModel())
+                    fs.save()
+                self.assertEqual(0, write.call_count)
+            self.assertEqual(1, write.call_count)
+
+    def test_deferred_other_thread(self):
+        """a deferred() block does not hold back other threads' saves"""
+        fs = FileStorage()
+        with patch.object(fs, "_FileStorage__write_snapshot") as write:
+            with fs.deferred():
+                fs.new(BaseModel())
+                fs.save()
+                thread = threading.Thread(target=fs.save)
+                thread.start()
+                thread.join()
+                self.assertEqual(1, write.call_count)
+
+    def test_save_dirty_only(self):
+        """save writes only when objects changed and counts them"""
+        fs = FileStorage()
+        objs = [BaseModel() for i in range(3)]
+        with patch.object(models, "storage", fs):
+            fs.bulk_new(objs)
+            self.assertEqual(3, fs.save_stats()["last_written"])
+            with patch.object(fs, "_FileStorage__write_snapshot") as write:
+                fs.save()
+                self.assertEqual(0, write.call_count)
+                objs[0].name = "changed"
+                fs.save()
+                self.assertEqual(1, write.call_count)
+                self.assertEqual(1, fs.save_stats()["last_written"])
+                fs.save(dirty_only=False)
+                self.assertEqual(2, write.call_count)
+                self.assertEqual(3, fs.save_stats()["last_written"])
+
+    def test_save_loaded_object(self):
+        """an assignment to a loaded object is saved"""
+        fs = FileStorage()
+        fs.new(State(name="A"))
+        fs.save()
+        loaded = FileStorage()
+        loaded.reload()
+        with patch.object(models, "storage", loaded):
+            state = list(loaded.all("State").values())[0]
+            self.assertEqual(set(), state.dirty_attributes())
+            state.name = "B"
+            loaded.save()
+        self.assertEqual(1, loaded.save_stats()["last_written"])
+        fs.reload()
+        self.assertEqual(["B"], [state.name for state in
+                                 fs.all(State).values()])
+
     def test_reload(self):
         """check if reload method is working"""
 
         self.assertIsNotNone(models.engine.file_storage.FileStorage().reload)
 
+    def test_reload_skips_unchanged_file(self):
+        """reload keeps the loaded objects while file.json is unchanged"""
+        fs = FileStorage()
+        fs.new(BaseModel())
+        fs.save()
+        other = FileStorage()
+        other.reload()
+        loaded = list(other.all().values())
+        other.reload()
+        self.assertEqual(loaded, list(other.all().values()))
+        self.assertIs(loaded[0], list(other.all().values())[0])
+
+    def test_reload_picks_up_changes(self):
+        """reload parses file.json again once another writer changed it"""
+        fs = FileStorage()
+        other = FileStorage()
+        other.reload()
+        base_model = BaseModel()
+        fs.new(base_model)
+        fs.save()
+        other.reload()
+        self.assertIn("BaseModel." + base_model.id, other.all())
+
+    def test_save_merges_concurrent_writer(self):
+        """a save keeps what another writer saved since our last load"""
+        fs = FileStorage()
+        other = FileStorage()
+        fs.reload()
+        other.reload()
+        first, second = BaseModel(), BaseModel()
+        fs.new(first)
+        fs.save()
+        other.new(second)
+        other.save()
+        check = FileStorage()
+        check.reload()
+        self.assertIn("BaseModel." + first.id, check.all())
+        self.assertIn("BaseModel." + second.id, check.all())
+        self.assertFalse([name for name in os.listdir(".")
+                          if name.startswith("file.json.")
+                          and name.endswith(".tmp")])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_reload_drops_deleted_elsewhere(self):
+        """objects another process deleted are dropped on reload and
+        not brought back by our next save"""
+        fs = FileStorage()
+        a, b = State(name="A"), State(name="B")
+        fs.bulk_new([a, b])
+        pid = os.fork()
+        if pid == 0:
+            other = FileStorage()
+            other.reload()
+            other.delete(other.get("State", b.id))
+            other.save()
+            os._exit(0)
+        self.assertEqual(0, os.waitpid(pid, 0)[1])
+        with patch.object(models, "storage", fs):
+            a.name = "A2"
+        fs.save()
+        self.assertIsNone(fs.get("State", b.id))
+        check = FileStorage()
+        check.reload()
+        self.assertEqual(["A2"], [state.name for state in
+                                  check.all(State).values()])
+
+    def test_reload_keeps_unsaved_changes(self):
+        """a reload does not overwrite objects waiting for a save"""
+        fs = FileStorage()
+        a = State(name="A")
+        fs.new(a)
+        fs.save()
+        other = FileStorage()
+        other.reload()
+        other.new(State(name="C"))
+        other.save()
+        with patch.object(models, "storage", fs):
+            a.name = "A2"
+        fs.reload()
+        self.assertIs(a, fs.get("State", a.id))
+        fs.save()
+        other.reload()
+        self.assertEqual(["A2", "C"], sorted(
+            state.name for state in other.all(State).values()))
+
+    def test_assignment_during_save(self):
+        """an attribute assigned by another thread while a save writes
+        the object is written by the next save"""
+        fs = FileStorage()
+        state = State(name="old")
+        fs.new(state)
+        encode = fs._FileStorage__format.encode
+
+        def assign_after_encode(obj):
+            record = encode(obj)
+            if obj is state and obj.name == "old":
+                with patch.object(models, "storage", fs):
+                    thread = threading.Thread(
+                        target=setattr, args=(state, "name", "new"))
+                    thread.start()
+                    thread.join()
+            return record
+
+        with patch.object(fs._FileStorage__format, "encode",
+                          assign_after_encode):
+            fs.save()
+        self.assertIn("name", state.dirty_attributes())
+        fs.save()
+        check = FileStorage()
+        check.reload()
+        self.assertEqual("new", check.get("State", state.id).name)
+
+    def test_reads_during_reload(self):
+        """threads reading while the storage reloads what another
+        process saved never see the indexes half changed"""
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        self.addCleanup(sys.setswitchinterval, interval)
+        fs = FileStorage()
+        other = FileStorage()
+        other.bulk_new([State(name="S{:03}".format(i)) for i in range(200)])
+        fs.reload()
+        errors = []
+        done = threading.Event()
+
+        def read():
+            try:
+                while not done.is_set():
+                    fs.query(State, order_by="name", limit=50, offset=100)
+                    list(fs.stream(State, where={"name": "S001"}))
+                    fs.fingerprint(State)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=read) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(30):
+            other.new(State(name="T{}".format(i)))
+            other.save()
+            fs.reload()
+        done.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+        self.assertEqual(230, len(fs.query(State, order_by="name")))
+
+    def test_write_behind_coalesces_saves(self):
+        """saves are left to the writer thread and flushed as one"""
+        with patch.dict(os.environ, {"HBNB_FILE_WRITE_BEHIND": "60"}):
+            fs = FileStorage()
+        for i in range(3):
+            fs.new(BaseModel())
+            fs.save()
+        self.assertFalse(os.path.exists("file.json"))
+        fs.flush()
+        self.assertEqual(1, fs.save_stats()["saves"])
+        self.assertEqual(3, fs.save_stats()["written"])
+        other = FileStorage()
+        other.reload()
+        self.assertEqual(3, len(other.all()))
+
+    def test_write_behind_writes_within_delay(self):
+        """the writer thread saves on its own after the delay"""
+        with patch.dict(os.environ, {"HBNB_FILE_WRITE_BEHIND": "0.01"}):
+            fs = FileStorage()
+        fs.new(BaseModel())
+        fs.save()
+        for i in range(200):
+            if fs.save_stats()["saves"]:
+                break
+            time.sleep(0.01)
+        self.assertTrue(os.path.exists("file.json"))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_write_behind_after_fork(self):
+        """a forked process gets a writer thread of its own"""
+        with patch.dict(os.environ, {"HBNB_FILE_WRITE_BEHIND": "0.01"}):
+            fs = FileStorage()
+        pid = os.fork()
+        if pid == 0:
+            fs.new(BaseModel())
+            fs.save()
+            for i in range(200):
+                if fs.save_stats()["saves"]:
+                    os._exit(0)
+                time.sleep(0.01)
+            os._exit(1)
+        self.assertEqual(os.waitpid(pid, 0)[1], 0)
+        self.assertTrue(os.path.exists("file.json"))
+
+
+class Test_FileStorage_pickle(unittest.TestCase):
+    """test the binary snapshot format and lazy loading"""
+
+    def setUp(self):
+        try:
+            os.rename("file.pickle", "file.pickle.bak")
+        except IOError:
+            pass
+
+    def tearDown(self):
+        try:
+            os.remove("file.pickle")
+        except IOError:
+            pass
+        try:
+            os.rename("file.pickle.bak", "file.pickle")
+        except IOError:
+            pass
+
+    def pickle_storage(self):
+        with patch.dict(os.environ, {"HBNB_FILE_FORMAT": "pickle"}):
+            return FileStorage()
+
+    def test_round_trip(self):
+        fs = self.pickle_storage()
+        base_model = BaseModel(name="pickled")
+        fs.new(base_model)
+        fs.save()
+        self.assertTrue(os.path.exists("file.pickle"))
+        other = self.pickle_storage()
+        other.reload()
+        loaded = other.all()["BaseModel." + base_model.id]
+        self.assertEqual(base_model.created_at, loaded.created_at)
+        self.assertEqual(base_model.updated_at, loaded.updated_at)
+        self.assertEqual("pickled", loaded.name)
+
+    def test_get_builds_one_object(self):
+        fs = self.pickle_storage()
+        objs = [BaseModel() for i in range(2)]
+        fs.bulk_new(objs)
+        other = self.pickle_storage()
+        other.reload()
+        self.assertEqual(objs[0].id, other.get(BaseModel, objs[0].id).id)
+        self.assertEqual(1, len(other._FileStorage__records["BaseModel"]))
+        self.assertIsNone(other.get("BaseModel", "missing"))
+
+    def test_reload_is_lazy(self):
+        fs = self.pickle_storage()
+        fs.new(BaseModel())
+        fs.save()
+        other = self.pickle_storage()
+        other.reload()
+        self.assertIn("BaseModel", other._FileStorage__records)
+        self.assertEqual(0, len(other.all("State")))
+        self.assertIn("BaseModel", other._FileStorage__records)
+        self.assertEqual(1, len(other.all()))
+        self.assertEqual({}, other._FileStorage__records)
+
+    def test_preload(self):
+        fs = self.pickle_storage()
+        fs.new(BaseModel())
+        fs.save()
+        other = self.pickle_storage()
+        other.reload()
+        other.preload()
+        self.assertEqual({}, other._FileStorage__records)
+        self.assertEqual(1, len(other.all()))
+
+    def test_concurrent_first_reads(self):
+        """threads reading a class being built wait for all of it"""
+        fs = self.pickle_storage()
+        fs.bulk_new([State(name=str(i)) for i in range(100)])
+        other = self.pickle_storage()
+        other.reload()
+        from_dicts = State.from_dicts
+
+        def slow_from_dicts(dicts):
+            dicts = list(dicts)
+            if dicts:
+                time.sleep(0.05)
+            return from_dicts(dicts)
+
+        counts = []
+
+        def read():
+            counts.append(len(other.query("State", order_by="name")))
+
+        with patch.object(State, "from_dicts", slow_from_dicts):
+            threads = [threading.Thread(target=read) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual([100] * 4, counts)
+
+
+class Test_FileStorage_sharded(unittest.TestCase):
+    """test the one file per class layout"""
+
+    def setUp(self):
+        try:
+            os.rename("file_store", "file_store.bak")
+        except IOError:
+            pass
+
+    def tearDown(self):
+        shutil.rmtree("file_store", ignore_errors=True)
+        try:
+            os.rename("file_store.bak", "file_store")
+        except IOError:
+            pass
+
+    def sharded_storage(self):
+        with patch.dict(os.environ, {"HBNB_FILE_LAYOUT": "sharded"}):
+            return FileStorage()
+
+    def test_save_writes_touched_classes(self):
+        fs = self.sharded_storage()
+        state = State(name="California")
+        fs.new(state)
+        fs.new(BaseModel())
+        fs.save()
+        self.assertEqual(["BaseModel.json", "State.json"],
+                         sorted(os.listdir("file_store")))
+        base_model_file = os.stat("file_store/BaseModel.json")
+        with patch.object(models, "storage", fs):
+            state.name = "Nevada"
+        fs.save()
+        self.assertEqual(base_model_file,
+                         os.stat("file_store/BaseModel.json"))
+        other = self.sharded_storage()
+        other.reload()
+        self.assertEqual("Nevada",
+                         other.get(State, state.id).name)
+        self.assertEqual(2, len(other.all()))
+
+    def test_reload_reads_changed_classes(self):
+        fs = self.sharded_storage()
+        fs.new(State(name="California"))
+        fs.new(BaseModel())
+        fs.save()
+        other = self.sharded_storage()
+        other.reload()
+        base_models = list(other.all(BaseModel).values())
+        fs.new(State(name="Nevada"))
+        fs.save()
+        other.reload()
+        self.assertEqual(2, len(other.all(State)))
+        self.assertIs(base_models[0], other.all()[
+            "BaseModel." + base_models[0].id])
+
+
+class Test_FileStorage_journal(unittest.TestCase):
+    """test the append-only journal mode"""
+
+    def setUp(self):
+        for name in ("file.json", "file.json.log", "file.json.log.1"):
+            try:
+                os.rename(name, name + ".bak")
+            except IOError:
+                pass
+
+    def tearDown(self):
+        for name in ("file.json", "file.json.log", "file.json.log.1"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+            try:
+                os.rename(name + ".bak", name)
+            except IOError:
+                pass
+
+    def journal_storage(self, compact_every="100"):
+        env = {"HBNB_FILE_JOURNAL": "1",
+               "HBNB_FILE_COMPACT_EVERY": compact_every}
+        with patch.dict(os.environ, env):
+            return FileStorage()
+
+    def test_save_appends_changes_only(self):
+        fs = self.journal_storage()
+        first = BaseModel()
+        fs.new(first)
+        fs.save()
+        second = BaseModel()
+        fs.new(second)
+        fs.save()
+        self.assertFalse(os.path.exists("file.json"))
+        with open("file.json.log", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(2, len(lines))
+        self.assertIn(second.id, lines[1])
+        self.assertNotIn(first.id, lines[1])
+
+    def test_save_appends_assigned_attributes(self):
+        fs = self.journal_storage()
+        base_model = BaseModel()
+        with patch.object(models, "storage", fs):
+            fs.new(base_model)
+            fs.save()
+            base_model.name = "changed"
+            fs.save()
+        other = self.journal_storage()
+        other.reload()
+        loaded = other.all()["BaseModel." + base_model.id]
+        self.assertEqual("changed", loaded.name)
+
+    def test_reload_replays_journal(self):
+        fs = self.journal_storage()
+        kept = BaseModel()
+        gone = BaseModel()
+        fs.new(kept)
+        fs.new(gone)
+        fs.save()
+        fs.delete(gone)
+        fs.save()
+        other = self.journal_storage()
+        other.reload()
+        self.assertIn("BaseModel." + kept.id, other.all())
+        self.assertNotIn("BaseModel." + gone.id, other.all())
+
+    def test_reload_replays_only_new_records(self):
+        fs = self.journal_storage()
+        other = self.journal_storage()
+        first = BaseModel()
+        fs.new(first)
+        fs.save()
+        other.reload()
+        loaded = other.all()["BaseModel." + first.id]
+        second = BaseModel()
+        fs.new(second)
+        fs.save()
+        other.reload()
+        self.assertIs(loaded, other.all()["BaseModel." + first.id])
+        self.assertIn("BaseModel." + second.id, other.all())
+
+    def test_compaction_writes_snapshot(self):
+        fs = self.journal_storage(compact_every="3")
+        objs = [BaseModel() for i in range(3)]
+        for obj in objs:
+            fs.new(obj)
+        fs.save()
+        fs.compact(wait=True)
+        self.assertTrue(os.path.exists("file.json"))
+        self.assertFalse(os.path.exists("file.json.log.1"))
+        other = self.journal_storage()
+        other.reload()
+        for obj in objs:
+            self.assertIn("BaseModel." + obj.id, other.all())
+
 
 if __name__ == '__main__':
     unittest.main()
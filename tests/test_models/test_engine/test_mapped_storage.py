@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Unitest for the MappedStorage class
+"""
+import os
+import unittest
+from unittest.mock import patch
+import models
+from models.engine.mapped_storage import MappedStorage
+from models.base_model import BaseModel
+
+
+class Test_MappedStorage(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            os.rename("file.dat", "file.dat.bak")
+        except IOError:
+            pass
+
+    def tearDown(self):
+        try:
+            os.remove("file.dat")
+        except IOError:
+            pass
+        try:
+            os.rename("file.dat.bak", "file.dat")
+        except IOError:
+            pass
+
+    def test_get(self):
+        """get returns one object without reading the others"""
+        ms = MappedStorage()
+        objs = [BaseModel(name=str(i)) for i in range(3)]
+        for obj in objs:
+            ms.new(obj)
+        ms.save()
+        other = MappedStorage()
+        other.reload()
+        self.assertEqual("1", other.get("BaseModel", objs[1].id).name)
+        self.assertEqual(1, len(other._MappedStorage__objects))
+        self.assertIsNone(other.get(BaseModel, "missing"))
+
+    def test_update_and_delete(self):
+        """updates and deletions are appended and seen after reload"""
+        ms = MappedStorage()
+        kept = BaseModel(name="old")
+        gone = BaseModel()
+        ms.new(kept)
+        ms.new(gone)
+        ms.save()
+        kept.name = "new"
+        ms.new(kept)
+        ms.delete(gone)
+        ms.save()
+        other = MappedStorage()
+        other.reload()
+        self.assertEqual(["BaseModel." + kept.id], list(other.all()))
+        self.assertEqual("new", other.get("BaseModel", kept.id).name)
+
+    def test_fingerprint_rename(self):
+        """a change leaving updated_at as it was moves the fingerprint,
+        here and in a process reloading it"""
+        ms = MappedStorage()
+        obj = BaseModel(name="a")
+        ms.new(obj)
+        ms.save()
+        other = MappedStorage()
+        other.reload()
+        before = ms.fingerprint(BaseModel)
+        other_before = other.fingerprint(BaseModel)
+        self.assertEqual(before, ms.fingerprint(BaseModel))
+        with patch.object(models, "storage", ms):
+            obj.name = "b"
+            ms.new(obj)
+            ms.save()
+        self.assertNotEqual(before, ms.fingerprint(BaseModel))
+        other.reload()
+        self.assertNotEqual(other_before, other.fingerprint(BaseModel))
+
+    def test_reload_reads_appended_records(self):
+        """reload indexes the records other writers appended"""
+        ms = MappedStorage()
+        other = MappedStorage()
+        other.reload()
+        base_model = BaseModel()
+        ms.new(base_model)
+        ms.save()
+        self.assertIsNone(other.get("BaseModel", base_model.id))
+        other.reload()
+        self.assertIsNotNone(other.get("BaseModel", base_model.id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Unitest for the SQLiteStorage class
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from sqlalchemy import inspect, text
+from models.engine.sqlite_storage import SQLiteStorage
+from models.state import State
+from models.city import City
+
+
+class Test_SQLiteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, "hbnb.db")
+        with patch.dict(os.environ, {"HBNB_SQLITE_PATH": path}):
+            self.storage = SQLiteStorage()
+        self.storage.reload()
+
+    def tearDown(self):
+        self.storage.close()
+        self.storage._DBStorage__engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def test_save_and_get(self):
+        """objects are written to the database file and read back"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.new(City(name="Fremont", state_id=state.id))
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual("California",
+                         self.storage.get(State, state.id).name)
+        self.assertEqual(1, len(self.storage.all("City")))
+
+    def test_query(self):
+        """query pages in SQL, with ties ordered by id"""
+        states = [State(name=name) for name in ("b", "a", "b")]
+        self.storage.bulk_new(states)
+        page = self.storage.query(State, order_by="name", limit=2, offset=1)
+        self.assertEqual(sorted(state.id for state in states
+                                if state.name == "b"),
+                         [state.id for state in page])
+
+    def test_query_after(self):
+        """query starts a page right after a (value, id) position"""
+        self.storage.bulk_new([State(name=name) for name in "bab"])
+        ordered = self.storage.query(State, order_by="name")
+        last = ordered[1]
+        self.assertEqual([state.id for state in ordered[2:]], [
+            state.id for state in self.storage.query(
+                State, order_by="name", after=(last.name, last.id))])
+
+    def test_fingerprint(self):
+        """fingerprint counts a table and finds its latest update"""
+        states = [State(name="a"), State(name="b")]
+        self.storage.bulk_new(states)
+        self.assertEqual((2, max(state.updated_at for state in states)),
+                         self.storage.fingerprint("State"))
+
+    def test_bulk_save_stats(self):
+        """rows written by the bulk methods are counted"""
+        states = [State(name=name) for name in "abc"]
+        self.storage.bulk_new(states)
+        self.assertEqual(3, self.storage.save_stats()["last_written"])
+        self.storage.close()
+        self.storage.bulk_update(states[:2], name="d")
+        self.assertEqual(2, self.storage.save_stats()["last_written"])
+        self.storage.bulk_delete(states)
+        self.assertEqual(3, self.storage.save_stats()["last_written"])
+        self.assertEqual(8, self.storage.save_stats()["written"])
+
+    def test_deferred_other_thread(self):
+        """a deferred() block does not hold back other threads' saves"""
+        def save_b():
+            self.storage.new(State(name="B"))
+            self.storage.save()
+            self.storage.close()
+
+        with self.storage.deferred():
+            self.storage.new(State(name="A"))
+            self.storage.save()
+            thread = threading.Thread(target=save_b)
+            thread.start()
+            thread.join()
+        self.storage.close()
+        self.assertEqual(["A", "B"], [state.name for state in
+                                      self.storage.query(State, "name")])
+
+    def test_pragmas(self):
+        """connections use WAL and enforce foreign keys"""
+        with self.storage._DBStorage__engine.connect() as connection:
+            self.assertEqual("wal", connection.execute(
+                text("PRAGMA journal_mode")).scalar())
+            self.assertEqual(1, connection.execute(
+                text("PRAGMA foreign_keys")).scalar())
+
+    def test_foreign_key_indexes(self):
+        """the foreign key columns are indexed"""
+        inspector = inspect(self.storage._DBStorage__engine)
+        indexed = [index["column_names"]
+                   for index in inspector.get_indexes("reviews")]
+        self.assertIn(["place_id"], indexed)
+        self.assertIn(["user_id"], indexed)
+
+    def plan(self, query, *params):
+        """return the query plan of a SELECT as one string"""
+        with self.storage._DBStorage__engine.connect() as connection:
+            rows = connection.exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + query, params).all()
+        return " | ".join(row[-1] for row in rows)
+
+    def test_hot_queries_use_indexes(self):
+        """the listing queries read indexes instead of sorting"""
+        plan = self.plan("SELECT * FROM states ORDER BY name")
+        self.assertIn("ix_states_name", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        plan = self.plan("SELECT * FROM cities WHERE state_id = ? "
+                         "ORDER BY name", "id")
+        self.assertIn("ix_cities_state_id_name", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        plan = self.plan("SELECT * FROM reviews WHERE place_id = ?", "id")
+        self.assertIn("ix_reviews_place_id", plan)
+
+    def test_migrate(self):
+        """migrate adds the new indexes and drops the redundant ones"""
+        with self.storage._DBStorage__engine.begin() as connection:
+            for statement in (
+                    "DROP INDEX ix_cities_state_id_name",
+                    "DROP INDEX ix_states_name",
+                    "CREATE INDEX state_id ON cities (state_id)",
+                    "CREATE UNIQUE INDEX id ON states (id)"):
+                connection.exec_driver_sql(statement)
+        changes = self.storage.migrate()
+        self.assertEqual(["ix_states_name", "ix_cities_state_id_name"],
+                         changes["created"])
+        self.assertEqual(["id", "state_id"], changes["dropped"])
+        self.assertEqual({"created": [], "dropped": []},
+                         self.storage.migrate())
+
+
+if __name__ == '__main__':
+    unittest.main()
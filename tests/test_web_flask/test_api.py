@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+"""
+Unittest for web_flask/api.py
+"""
+import base64
+import gzip
+import json
+import os
+import unittest
+from unittest.mock import patch
+import models
+from models.engine.file_storage import FileStorage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+from web_flask import api, create_app
+
+
+class Test_api(unittest.TestCase):
+    """test the JSON API over a storage of its own"""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        self.storage = FileStorage()
+        self.storage.reload()
+        patches = [patch.object(models, "storage", self.storage),
+                   patch.object(api, "storage", self.storage)]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = User(email="a@b.c", password="secret")
+        state = State(name="California")
+        self.city = City(name="Fremont", state_id=state.id)
+        self.places = [Place(name="P{}".format(i), number_rooms=i % 3,
+                             city_id=self.city.id, user_id=self.user.id,
+                             description="A quiet place " * 4)
+                       for i in range(5)]
+        self.storage.bulk_new([self.user, state, self.city] + self.places)
+        self.client = create_app(api.bp).test_client()
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_pages(self):
+        """cursor pages cover every object once, in id order"""
+        ids = []
+        cursor = None
+        while True:
+            args = {"limit": 2}
+            if cursor:
+                args["cursor"] = cursor
+            page = self.client.get("/api/v1/places",
+                                   query_string=args).get_json()
+            self.assertLessEqual(len(page["data"]), 2)
+            ids += [place["id"] for place in page["data"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(sorted(place.id for place in self.places), ids)
+
+    def test_fields(self):
+        """fields= returns only the attributes asked for"""
+        page = self.client.get(
+            "/api/v1/places?fields=name,number_rooms").get_json()
+        self.assertEqual([{"name", "number_rooms"}] * 5,
+                         [set(place) for place in page["data"]])
+        for fields in ("name,nope", "password"):
+            response = self.client.get("/api/v1/users?fields=" + fields)
+            self.assertEqual(400, response.status_code)
+            self.assertIn("error", response.get_json())
+
+    def test_filters(self):
+        """filters compare values converted to the column type"""
+        page = self.client.get(
+            "/api/v1/places?number_rooms=2&fields=name").get_json()
+        self.assertEqual(["P2"], [place["name"] for place in page["data"]])
+        page = self.client.get(
+            "/api/v1/cities?state_id=" + self.city.state_id).get_json()
+        self.assertEqual([self.city.id],
+                         [city["id"] for city in page["data"]])
+        for query in ("number_rooms=x", "nope=1", "created_at=x"):
+            response = self.client.get("/api/v1/places?" + query)
+            self.assertEqual(400, response.status_code)
+            self.assertIn("error", response.get_json())
+
+    def test_single(self):
+        """one object is returned without internal attributes"""
+        user = self.client.get("/api/v1/users/" + self.user.id).get_json()
+        self.assertEqual(self.user.id, user["id"])
+        self.assertEqual("a@b.c", user["email"])
+        self.assertNotIn("password", user)
+        self.assertNotIn("__class__", user)
+
+    def test_not_found(self):
+        """missing objects and resources get a JSON 404"""
+        for url in ("/api/v1/users/nope", "/api/v1/nope"):
+            response = self.client.get(url)
+            self.assertEqual(404, response.status_code)
+            self.assertEqual({"error": "Not found"}, response.get_json())
+
+    def test_bad_cursor(self):
+        """a cursor that is not a (value, id) position gets a 400"""
+        for position in ([1, "x"], ["a", 5], [["a"], "x"],
+                         {"a": 1, "b": 2}, ["a"]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(position).encode()).decode()
+            response = self.client.get("/api/v1/places?cursor=" + cursor)
+            self.assertEqual(400, response.status_code)
+        response = self.client.get("/api/v1/places?cursor=!!")
+        self.assertEqual(400, response.status_code)
+
+    def test_not_modified(self):
+        """a matching If-None-Match gets a 304"""
+        response = self.client.get("/api/v1/places")
+        response = self.client.get("/api/v1/places", headers={
+            "If-None-Match": response.headers["ETag"]})
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b"", response.data)
+
+    def test_gzip(self):
+        """responses are gzipped for clients accepting it"""
+        plain = self.client.get("/api/v1/places")
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertIn("Accept-Encoding", plain.headers["Vary"])
+        compressed = self.client.get("/api/v1/places", headers={
+            "Accept-Encoding": "gzip"})
+        self.assertEqual("gzip", compressed.headers["Content-Encoding"])
+        self.assertIn("Accept-Encoding", compressed.headers["Vary"])
+        self.assertLess(len(compressed.data), len(plain.data))
+        self.assertEqual(plain.data, gzip.decompress(compressed.data))
+        small = self.client.get("/api/v1/users/" + self.user.id, headers={
+            "Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", small.headers)
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""
+Unittest for the application serving every route, web_flask.create_app
+"""
+import importlib
+import os
+import unittest
+from unittest.mock import patch
+import models
+from models.engine.file_storage import FileStorage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+from web_flask import cache, create_app
+
+
+class Test_create_app(unittest.TestCase):
+    """test the routes of every application served together"""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        self.storage = FileStorage()
+        self.storage.reload()
+        patches = [patch.object(models, "storage", self.storage),
+                   patch.object(cache, "backend", cache.LRUCache())]
+        for name in ("api", "7-states_list", "100-hbnb"):
+            module = importlib.import_module("web_flask." + name)
+            patches.append(patch.object(module, "storage", self.storage))
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        user = User(email="a@b.c", password="secret", first_name="Ann",
+                    last_name="Lee")
+        state = State(name="California")
+        city = City(name="Fremont", state_id=state.id)
+        place = Place(name="Cozy", city_id=city.id, user_id=user.id)
+        self.storage.bulk_new([user, state, city, place])
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_pages(self):
+        """the pages of the numbered applications and the API answer"""
+        response = self.client.get("/states_list")
+        self.assertEqual(200, response.status_code)
+        self.assertIn(b"California", response.data)
+        response = self.client.get("/hbnb")
+        self.assertEqual(200, response.status_code)
+        self.assertIn(b"Cozy", response.data)
+        response = self.client.get("/api/v1/states")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(["California"], [
+            state["name"] for state in response.get_json()["data"]])
+
+    def test_first_registered_wins(self):
+        """a URL served by several applications goes to the latest"""
+        urls = self.app.url_map.bind("")
+        self.assertEqual("hbnb.hbnb", urls.match("/hbnb")[0])
+        self.assertEqual("number_odd_or_even.home", urls.match("/")[0])
+        self.assertEqual(b"Hello HBNB!", self.client.get("/").data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+#!/usr/bin/python3
+"""
+Unittest for web_flask/cache.py
+"""
+import os
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from flask import Flask
+from werkzeug.http import http_date
+import models
+from models.engine.file_storage import FileStorage
+from models.state import State
+from web_flask import cache
+from web_flask.cache import LRUCache, NullCache, cached, conditional
+
+
+class Test_LRUCache(unittest.TestCase):
+    """test the in-process page cache"""
+
+    def test_get_set(self):
+        """values are returned until replaced, None when missing"""
+        lru = LRUCache()
+        self.assertIsNone(lru.get("a"))
+        lru.set("a", 1)
+        self.assertEqual(1, lru.get("a"))
+        lru.set("a", 2)
+        self.assertEqual(2, lru.get("a"))
+        lru.clear()
+        self.assertIsNone(lru.get("a"))
+
+    def test_eviction(self):
+        """the least recently used entry goes first"""
+        lru = LRUCache(size=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertEqual(1, lru.get("a"))
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(3, lru.get("c"))
+
+    def test_ttl(self):
+        """entries expire ttl seconds after being set"""
+        lru = LRUCache(ttl=10)
+        with patch.object(cache.time, "monotonic", return_value=100.0):
+            lru.set("a", 1)
+        with patch.object(cache.time, "monotonic", return_value=109.0):
+            self.assertEqual(1, lru.get("a"))
+        with patch.object(cache.time, "monotonic", return_value=111.0):
+            self.assertIsNone(lru.get("a"))
+
+    def test_null_cache(self):
+        """NullCache keeps nothing"""
+        null = NullCache()
+        null.set("a", 1)
+        self.assertIsNone(null.get("a"))
+
+
+class Test_cached(unittest.TestCase):
+    """test the rendered page cache alone"""
+
+    def setUp(self):
+        self.renders = 0
+        app = Flask(__name__)
+
+        @app.route("/page")
+        @cached
+        def page():
+            self.renders += 1
+            return "page {}".format(self.renders)
+
+        @app.route("/response")
+        @cached
+        def response():
+            self.renders += 1
+            return app.response_class("response")
+
+        self.client = app.test_client()
+        patcher = patch.object(cache, "backend", LRUCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_key(self):
+        """pages are keyed by path and query arguments"""
+        self.assertEqual(b"page 1", self.client.get("/page?a=1&b=2").data)
+        self.assertEqual(b"page 1", self.client.get("/page?b=2&a=1").data)
+        self.assertEqual(b"page 2", self.client.get("/page?a=2").data)
+        self.assertEqual(b"page 3", self.client.get("/page").data)
+        self.assertEqual(3, self.renders)
+
+    def test_version(self):
+        """a change in storage, which bumps storage.version, is not
+        served from an older page"""
+        self.client.get("/page")
+        with patch.object(models.storage, "version",
+                          models.storage.version + 1):
+            self.assertEqual(b"page 2", self.client.get("/page").data)
+
+    def test_responses_not_cached(self):
+        """only rendered text is cached"""
+        self.client.get("/response")
+        self.client.get("/response")
+        self.assertEqual(2, self.renders)
+
+
+class Test_conditional_cached(unittest.TestCase):
+    """test a page both validated and cached"""
+
+    def setUp(self):
+        self.renders = 0
+        self.fingerprint = (1, datetime(2024, 1, 1))
+        app = Flask(__name__)
+
+        @app.route("/page")
+        @conditional("State")
+        @cached
+        def page():
+            self.renders += 1
+            return "page {}".format(self.renders)
+
+        self.client = app.test_client()
+        patches = [patch.object(cache, "backend", LRUCache()),
+                   patch.object(models.storage, "fingerprint",
+                                lambda cls: self.fingerprint)]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_change_elsewhere(self):
+        """a change made by another process, which moves the ETag but
+        not storage.version, is not served from the older page"""
+        first = self.client.get("/page")
+        self.assertEqual(b"page 1", self.client.get("/page").data)
+        self.fingerprint = (2, datetime(2024, 1, 2))
+        second = self.client.get("/page")
+        self.assertEqual(b"page 2", second.data)
+        self.assertNotEqual(first.headers["ETag"], second.headers["ETag"])
+        response = self.client.get("/page", headers={
+            "If-None-Match": second.headers["ETag"]})
+        self.assertEqual(304, response.status_code)
+
+    def test_version(self):
+        """a change in storage that leaves the ETag as it was, but bumps
+        storage.version, is not served from the older page"""
+        self.client.get("/page")
+        self.assertEqual(b"page 1", self.client.get("/page").data)
+        with patch.object(models.storage, "version",
+                          models.storage.version + 1):
+            self.assertEqual(b"page 2", self.client.get("/page").data)
+
+    def test_not_modified(self):
+        """a matching validator gets a 304 without running the view"""
+        first = self.client.get("/page")
+        self.assertEqual("public, no-cache", first.headers["Cache-Control"])
+        self.assertEqual(http_date(self.fingerprint[1].astimezone(
+            timezone.utc)), first.headers["Last-Modified"])
+        response = self.client.get("/page", headers={
+            "If-None-Match": first.headers["ETag"]})
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b"", response.data)
+        response = self.client.get("/page", headers={
+            "If-Modified-Since": first.headers["Last-Modified"]})
+        self.assertEqual(304, response.status_code)
+        with patch.object(cache, "backend", NullCache()):
+            self.client.get("/page", headers={
+                "If-None-Match": first.headers["ETag"]})
+        self.assertEqual(1, self.renders)
+
+
+class Test_conditional_storage(unittest.TestCase):
+    """test a page validated by the fingerprint of a real storage"""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        self.storage = FileStorage()
+        self.storage.reload()
+        app = Flask(__name__)
+
+        @app.route("/page")
+        @conditional("State")
+        @cached
+        def page():
+            return ",".join(state.name for state in
+                            self.storage.all(State).values())
+
+        self.client = app.test_client()
+        patches = [patch.object(cache, "backend", LRUCache()),
+                   patch.object(models, "storage", self.storage)]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_rename(self):
+        """a rename that leaves updated_at as it was, as the console
+        makes them, moves the ETag and is not served from the cache"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        first = self.client.get("/page")
+        self.assertEqual(b"California", first.data)
+        state.name = "Nevada"
+        self.storage.new(state)
+        self.storage.save()
+        response = self.client.get("/page", headers={
+            "If-None-Match": first.headers["ETag"]})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b"Nevada", response.data)
+        self.assertNotEqual(first.headers["ETag"], response.headers["ETag"])
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+"""
+Unittest for web_flask/100-hbnb.py
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# the relationships the pages load eagerly only exist when the models
+# are imported for a database, so the pages are rendered by a Python
+# started with HBNB_TYPE_STORAGE=sqlite
+RENDER = """
+import importlib, json, sys
+from sqlalchemy import event
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+from web_flask import create_app
+
+statements = []
+event.listen(models.storage._DBStorage__engine, "before_cursor_execute",
+             lambda *args: statements.append(args[2]))
+client = create_app(
+    importlib.import_module("web_flask.100-hbnb").bp).test_client()
+counts = {}
+rows = 0
+for n in map(int, sys.argv[1:]):
+    user = User(email="a@b.c", password="secret")
+    objs = [user]
+    for i in range(rows, n):
+        state = State(name="S{}".format(i))
+        city = City(name="C{}".format(i), state_id=state.id)
+        place = Place(name="P{}".format(i), city_id=city.id,
+                      user_id=user.id)
+        objs += [state, city, place, Amenity(name="A{}".format(i))]
+        objs += [Review(text="Nice", place_id=place.id, user_id=user.id)
+                 for j in range(3)]
+    rows = n
+    models.storage.bulk_new(objs)
+    models.storage.close()
+    for url in ("/hbnb", "/hbnb/places"):
+        del statements[:]
+        assert client.get(url).status_code == 200
+        counts.setdefault(url, []).append(len(statements))
+print(json.dumps(counts))
+"""
+
+
+class Test_hbnb(unittest.TestCase):
+    """test the queries run by the HBnB pages over SQLite"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def render(self, *rows):
+        """return the number of SQL statements of each page, rendered
+        once the database holds each number of rows in turn"""
+        env = dict(os.environ, HBNB_TYPE_STORAGE="sqlite", HBNB_CACHE="none",
+                   HBNB_SQLITE_PATH=os.path.join(self.directory, "hbnb.db"))
+        output = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", RENDER] +
+            [str(n) for n in rows], env=env, check=True,
+            stdout=subprocess.PIPE).stdout
+        return json.loads(output)
+
+    def test_statements_bounded(self):
+        """the number of statements does not grow with the rows"""
+        counts = self.render(10, 20, 40)
+        for url in ("/hbnb", "/hbnb/places"):
+            self.assertEqual(1, len(set(counts[url])), (url, counts[url]))
+            self.assertLessEqual(counts[url][0], 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
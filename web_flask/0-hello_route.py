@@ -3,15 +3,16 @@
 starts a Flask web application
 """
 
-from flask import Flask
-app = Flask(__name__)
+from flask import Blueprint
+from web_flask import create_app
+bp = Blueprint("hello_route", __name__)
 
 
-@app.route('/', strict_slashes=False)
+@bp.route('/', strict_slashes=False)
 def home():
     """returns Hello HBNB!"""
     return 'Hello HBNB!'
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port='5000')
+    create_app(bp).run(host='0.0.0.0', port='5000')
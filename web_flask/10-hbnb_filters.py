@@ -6,26 +6,24 @@ Routes:
     /hbnb_filters: HBnB HTML filters page.
 """
 from models import storage
-from flask import Flask
+from flask import Blueprint
 from flask import render_template
+from web_flask import create_app
+from web_flask.cache import cached, conditional
 
-app = Flask(__name__)
+bp = Blueprint("hbnb_filters", __name__)
 
 
-@app.route("/hbnb_filters", strict_slashes=False)
+@bp.route("/hbnb_filters", strict_slashes=False)
+@conditional("State", "City", "Amenity")
+@cached
 def hbnb_filters():
     """Displays the main HBnB filters HTML page."""
-    states = storage.all("State")
-    amenities = storage.all("Amenity")
+    states = storage.query("State", order_by="name", load=["cities"])
+    amenities = storage.query("Amenity", order_by="name")
     return render_template("10-hbnb_filters.html",
                            states=states, amenities=amenities)
 
 
-@app.teardown_appcontext
-def teardown(exc):
-    """Remove the current SQLAlchemy session."""
-    storage.close()
-
-
 if __name__ == "__main__":
-    app.run(host="0.0.0.0")
+    create_app(bp).run(host="0.0.0.0")
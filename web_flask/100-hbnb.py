@@ -4,29 +4,47 @@
 The application listens on 0.0.0.0, port 5000.
 Routes:
     /hbnb: HBnB home page.
+    /hbnb/places: one page of places alone, to append to the home page.
 """
 from models import storage
-from flask import Flask
+from flask import Blueprint
 from flask import render_template
+from web_flask import create_app, keyset
+from web_flask.cache import cached, conditional
 
-app = Flask(__name__)
+bp = Blueprint("hbnb", __name__)
 
 
-@app.route("/hbnb", strict_slashes=False)
+def places_page():
+    """Returns the places of the page named by ?cursor= and the cursor
+    of the next page."""
+    return keyset(storage.query, "name", cls="Place",
+                  load=["user", "reviews.user"])
+
+
+@bp.route("/hbnb", strict_slashes=False)
+@conditional("State", "City", "Amenity", "Place", "User", "Review")
+@cached
 def hbnb():
     """Displays the main HBnB filters HTML page."""
-    states = storage.all("State")
-    amenities = storage.all("Amenity")
-    places = storage.all("Place")
+    states = storage.query("State", order_by="name", load=["cities"])
+    amenities = storage.query("Amenity", order_by="name")
+    places, next_cursor = places_page()
     return render_template("100-hbnb.html",
-                           states=states, amenities=amenities, places=places)
+                           states=states, amenities=amenities, places=places,
+                           next_cursor=next_cursor)
 
 
-@app.teardown_appcontext
-def teardown(exc):
-    """Remove the current SQLAlchemy session."""
-    storage.close()
+@bp.route("/hbnb/places", strict_slashes=False)
+@conditional("Amenity", "Place", "User", "Review")
+@cached
+def hbnb_places():
+    """Renders one page of places, without the rest of the page."""
+    amenities = storage.query("Amenity", order_by="name")
+    places, next_cursor = places_page()
+    return render_template("100-hbnb_places.html", amenities=amenities,
+                           places=places, next_cursor=next_cursor)
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0")
+    create_app(bp).run(host="0.0.0.0")
@@ -3,23 +3,24 @@
 starts a Flask web application
 """
 
-from flask import Flask
-app = Flask(__name__)
+from flask import Blueprint
+from web_flask import create_app
+bp = Blueprint("c_route", __name__)
 
 
-@app.route('/', strict_slashes=False)
+@bp.route('/', strict_slashes=False)
 def home():
     """returns Hello HBNB!"""
     return 'Hello HBNB!'
 
 
-@app.route('/hbnb', strict_slashes=False)
+@bp.route('/hbnb', strict_slashes=False)
 def hbnb():
     """returns HBNB"""
     return 'HBNB'
 
 
-@app.route('/c/<text>', strict_slashes=False)
+@bp.route('/c/<text>', strict_slashes=False)
 def cfun(text):
     """display “C ” followed by the value of
     the text variable (replace underscore _ symbols with a space )"""
@@ -27,4 +28,4 @@ def cfun(text):
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port='5000')
+    create_app(bp).run(host='0.0.0.0', port='5000')
@@ -3,31 +3,32 @@
 starts a Flask web application
 """
 
-from flask import Flask
-app = Flask(__name__)
+from flask import Blueprint
+from web_flask import create_app
+bp = Blueprint("python_route", __name__)
 
 
-@app.route('/', strict_slashes=False)
+@bp.route('/', strict_slashes=False)
 def home():
     """returns Hello HBNB!"""
     return 'Hello HBNB!'
 
 
-@app.route('/hbnb', strict_slashes=False)
+@bp.route('/hbnb', strict_slashes=False)
 def hbnb():
     """returns HBNB"""
     return 'HBNB'
 
 
-@app.route('/c/<text>', strict_slashes=False)
+@bp.route('/c/<text>', strict_slashes=False)
 def cfun(text):
     """display “C ” followed by the value of
     the text variable (replace underscore _ symbols with a space )"""
     return 'C ' + text.replace('_', ' ')
 
 
-@app.route('/python/')
-@app.route('/python/<text>')
+@bp.route('/python/')
+@bp.route('/python/<text>')
 def python_text(text='is cool'):
     """ replace more text with another variable. """
     text = text.replace('_', ' ')
@@ -35,4 +36,4 @@ def python_text(text='is cool'):
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port='5000')
+    create_app(bp).run(host='0.0.0.0', port='5000')
@@ -3,42 +3,43 @@
 starts a Flask web application
 """
 
-from flask import Flask
-app = Flask(__name__)
+from flask import Blueprint
+from web_flask import create_app
+bp = Blueprint("number_route", __name__)
 
 
-@app.route('/', strict_slashes=False)
+@bp.route('/', strict_slashes=False)
 def home():
     """returns Hello HBNB!"""
     return 'Hello HBNB!'
 
 
-@app.route('/hbnb', strict_slashes=False)
+@bp.route('/hbnb', strict_slashes=False)
 def hbnb():
     """returns HBNB"""
     return 'HBNB'
 
 
-@app.route('/c/<text>', strict_slashes=False)
+@bp.route('/c/<text>', strict_slashes=False)
 def cfun(text):
     """display “C ” followed by the value of
     the text variable (replace underscore _ symbols with a space )"""
     return 'C ' + text.replace('_', ' ')
 
 
-@app.route('/python/')
-@app.route('/python/<text>')
+@bp.route('/python/')
+@bp.route('/python/<text>')
 def python_text(text='is cool'):
     """ replace more text with another variable. """
     text = text.replace('_', ' ')
     return 'Python {}'.format(text)
 
 
-@app.route('/number/<int:n>', strict_slashes=False)
+@bp.route('/number/<int:n>', strict_slashes=False)
 def init_only(n):
     """display “n is a number” only if n is an integer"""
     return "{:d} is a number".format(n)
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port='5000')
+    create_app(bp).run(host='0.0.0.0', port='5000')
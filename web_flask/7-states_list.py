@@ -3,23 +3,24 @@
 starts a Flask web application
 """
 
-from flask import Flask, render_template
+from flask import Blueprint, render_template
 from models import *
 from models import storage
-app = Flask(__name__)
+from web_flask import create_app, paginate
+from web_flask.cache import cached, conditional
+bp = Blueprint("states_list", __name__)
 
 
-@app.route('/states_list', strict_slashes=False)
+@bp.route('/states_list', strict_slashes=False)
+@conditional("State")
+@cached
 def states_list():
     """display a HTML page with the states listed in alphabetical order"""
-    states = sorted(list(storage.all("State").values()), key=lambda x: x.name)
-    return render_template('7-states_list.html', states=states)
+    states, page, has_next = paginate(storage.query, cls="State",
+                                      order_by="name")
+    return render_template('7-states_list.html', states=states,
+                           page=page, has_next=has_next)
 
 
-@app.teardown_appcontext
-def teardown_db(exception):
-    """closes the storage on teardown"""
-    storage.close()
-
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port='5000')
+    create_app(bp).run(host='0.0.0.0', port='5000')
@@ -3,23 +3,24 @@
 starts a Flask web application
 """
 
-from flask import Flask, render_template
+from flask import Blueprint, render_template
 from models import *
 from models import storage
-app = Flask(__name__)
+from web_flask import create_app, paginate
+from web_flask.cache import cached, conditional
+bp = Blueprint("cities_by_states", __name__)
 
 
-@app.route('/cities_by_states', strict_slashes=False)
+@bp.route('/cities_by_states', strict_slashes=False)
+@conditional("State", "City")
+@cached
 def cities_by_states():
     """display the states and cities listed in alphabetical order"""
-    states = storage.all("State").values()
-    return render_template('8-cities_by_states.html', states=states)
+    states, page, has_next = paginate(storage.query, cls="State",
+                                      order_by="name", load=["cities"])
+    return render_template('8-cities_by_states.html', states=states,
+                           page=page, has_next=has_next)
 
 
-@app.teardown_appcontext
-def teardown_db(exception):
-    """closes the storage on teardown"""
-    storage.close()
-
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port='5000')
+    create_app(bp).run(host='0.0.0.0', port='5000')
@@ -3,26 +3,33 @@
 starts a Flask web application
 """
 
-from flask import Flask, render_template
+from flask import Blueprint, render_template
 from models import *
 from models import storage
-app = Flask(__name__)
+from web_flask import create_app, paginate
+from web_flask.cache import cached, conditional
+bp = Blueprint("states", __name__)
 
 
-@app.route('/states', strict_slashes=False)
-@app.route('/states/<state_id>', strict_slashes=False)
+@bp.route('/states', strict_slashes=False)
+@bp.route('/states/<state_id>', strict_slashes=False)
+@conditional("State", "City")
+@cached
 def states(state_id=None):
     """display the states and cities listed in alphabetical order"""
-    states = storage.all("State")
     if state_id is not None:
-        state_id = 'State.' + state_id
-    return render_template('9-states.html', states=states, state_id=state_id)
+        state = storage.get("State", state_id)
+        cities = []
+        if state is not None:
+            cities = storage.query("City", where={"state_id": state_id},
+                                   order_by="name")
+        return render_template('9-states.html', state_id=state_id,
+                               state=state, cities=cities)
+    states, page, has_next = paginate(storage.query, cls="State",
+                                      order_by="name")
+    return render_template('9-states.html', states=states,
+                           page=page, has_next=has_next)
 
 
-@app.teardown_appcontext
-def teardown_db(exception):
-    """closes the storage on teardown"""
-    storage.close()
-
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port='5000')
+    create_app(bp).run(host='0.0.0.0', port='5000')
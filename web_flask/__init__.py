@@ -0,0 +1,95 @@
+"""Application factory and helpers shared by the HBnB Flask
+applications."""
+import base64
+import importlib
+import json
+from os import getenv
+from flask import Flask, abort, request
+import models
+
+PER_PAGE = int(getenv('HBNB_PAGE_SIZE', '100'))
+
+# the applications, the JSON API then the numbered ones latest first:
+# where two of them serve the same URL, the first registered wins
+scripts = ["api", "100-hbnb", "10-hbnb_filters", "9-states",
+           "8-cities_by_states", "7-states_list", "6-number_odd_or_even",
+           "5-number_template", "4-number_route", "3-python_route",
+           "2-c_route", "1-hbnb_route", "0-hello_route"]
+
+
+def create_app(*blueprints):
+    """create the HBnB Flask application serving the routes of
+    blueprints, by default those of every application
+
+    The configuration is read from the FLASK_* environment variables
+    and models.storage, shared by every route, is closed after each
+    request.
+    """
+    app = Flask(__name__)
+    app.config.from_prefixed_env()
+    if not blueprints:
+        blueprints = [importlib.import_module("web_flask." + name).bp
+                      for name in scripts]
+    for blueprint in blueprints:
+        app.register_blueprint(blueprint)
+
+    @app.teardown_appcontext
+    def teardown(exception):
+        """closes the storage on teardown"""
+        models.storage.close()
+
+    return app
+
+
+def paginate(query, **kwargs):
+    """run a storage query for the page named by the ?page= argument
+
+    Returns the objects of the page, the page number and whether
+    another page follows.
+    """
+    page = max(request.args.get("page", 1, type=int), 1)
+    objs = query(limit=PER_PAGE + 1, offset=(page - 1) * PER_PAGE, **kwargs)
+    return objs[:PER_PAGE], page, len(objs) > PER_PAGE
+
+
+def encode_cursor(obj, name):
+    """return the opaque cursor of the position right after obj in
+    the order of attribute name"""
+    position = json.dumps([getattr(obj, name), obj.id])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """return the (value, id) position of a cursor, or abort with a
+    400 response when it is not one
+
+    Pages are ordered by string attributes (name, id), so the value
+    must be a string or None, like the id a string.
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        abort(400)
+    if not isinstance(position, list) or len(position) != 2 or \
+            not isinstance(position[0], (str, type(None))) or \
+            not isinstance(position[1], str):
+        abort(400)
+    return tuple(position)
+
+
+def keyset(query, order_by, **kwargs):
+    """run a storage query for the page following the ?cursor= argument,
+    in the order of one attribute
+
+    Unlike paginate(), the cost of a page does not grow with its
+    depth. Returns the objects of the page and the cursor of the
+    next one, or None on the last page.
+    """
+    cursor = request.args.get("cursor")
+    after = decode_cursor(cursor) if cursor else None
+    objs = query(order_by=order_by, limit=PER_PAGE + 1, after=after,
+                 **kwargs)
+    if len(objs) <= PER_PAGE:
+        return objs, None
+    return objs[:PER_PAGE], encode_cursor(objs[PER_PAGE - 1],
+                                          order_by.lstrip("-"))
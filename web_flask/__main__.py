@@ -0,0 +1,8 @@
+#!/usr/bin/python3
+"""
+starts the Flask web application serving every HBnB route
+"""
+from web_flask import create_app
+
+if __name__ == '__main__':
+    create_app().run(host='0.0.0.0', port='5000')
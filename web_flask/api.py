@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+"""Starts a Flask web application serving the HBnB JSON API.
+
+The application listens on 0.0.0.0, port 5000.
+Routes:
+    /api/v1/<resource>: one page of the objects of a resource, states,
+        cities, amenities, places, reviews or users.
+    /api/v1/<resource>/<id>: one object.
+
+Query arguments:
+    fields: comma separated attributes to return, all by default.
+    limit: objects per page, up to MAX_LIMIT (default PER_PAGE).
+    cursor: the next_cursor of the previous page.
+    any other column, e.g. state_id=...: return only the objects
+        whose attribute equals the value.
+
+Pages are ordered by id. Responses carry an ETag, answering matching
+conditional GETs with a 304, and are gzipped for clients accepting it.
+"""
+import gzip
+from flask import Blueprint, abort, jsonify, request
+from sqlalchemy import inspect
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+from web_flask import PER_PAGE, create_app, decode_cursor, encode_cursor
+
+bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+resources = {"states": State, "cities": City, "amenities": Amenity,
+             "places": Place, "reviews": Review, "users": User}
+# attributes never sent to clients
+hidden = {"password", "__class__"}
+MAX_LIMIT = 1000
+# smaller responses are not worth compressing
+GZIP_MIN_SIZE = 500
+
+
+def resource(name):
+    """Returns the class of a resource, or aborts with a 404."""
+    if name not in resources:
+        abort(404, "Not found")
+    return resources[name]
+
+
+def columns(cls):
+    """Returns the columns of cls clients may read and filter on."""
+    return {column.name: column for column in cls.__table__.columns
+            if column.name not in hidden}
+
+
+def projection(cls):
+    """Returns the attribute names asked for by ?fields=, or None."""
+    fields = request.args.get("fields")
+    if not fields:
+        return None
+    names = fields.split(",")
+    unknown = set(names) - set(columns(cls))
+    if unknown:
+        abort(400, "Unknown fields: " + ", ".join(sorted(unknown)))
+    return names
+
+
+def filters(cls):
+    """Returns the {column: value} equalities asked for by the query
+    arguments, values converted to the column types."""
+    where = {}
+    known = columns(cls)
+    for name, value in request.args.items():
+        if name in ("fields", "limit", "cursor"):
+            continue
+        if name not in known or name in ("created_at", "updated_at"):
+            abort(400, "Unknown filter: " + name)
+        try:
+            where[name] = known[name].type.python_type(value)
+        except ValueError:
+            abort(400, "Bad value for " + name)
+    return where
+
+
+def record(obj, fields):
+    """Returns the dictionary sent for obj, with only fields if any."""
+    data = obj.to_dict()
+    # relationships loaded by the database session are not attributes
+    for name in hidden.union(inspect(type(obj)).relationships.keys()):
+        data.pop(name, None)
+    if fields is None:
+        return data
+    return {name: data.get(name) for name in fields}
+
+
+def respond(payload):
+    """Returns the JSON response of payload, a 304 when the client
+    already has it."""
+    response = jsonify(payload)
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
+
+
+@bp.route("/<name>", strict_slashes=False)
+def objects(name):
+    """Returns one page of the objects of a resource."""
+    cls = resource(name)
+    fields = projection(cls)
+    where = filters(cls)
+    limit = request.args.get("limit", PER_PAGE, type=int)
+    if limit < 1:
+        abort(400, "Bad value for limit")
+    limit = min(limit, MAX_LIMIT)
+    cursor = request.args.get("cursor")
+    after = decode_cursor(cursor) if cursor else None
+    objs = storage.query(cls, order_by="id", limit=limit + 1, after=after,
+                         where=where)
+    next_cursor = None
+    if len(objs) > limit:
+        objs = objs[:limit]
+        next_cursor = encode_cursor(objs[-1], "id")
+    return respond({"data": [record(obj, fields) for obj in objs],
+                    "next_cursor": next_cursor})
+
+
+@bp.route("/<name>/<id>", strict_slashes=False)
+def single(name, id):
+    """Returns one object of a resource."""
+    cls = resource(name)
+    fields = projection(cls)
+    obj = storage.get(cls, id)
+    if obj is None:
+        abort(404, "Not found")
+    return respond(record(obj, fields))
+
+
+@bp.errorhandler(400)
+@bp.errorhandler(404)
+def error(exception):
+    """Returns the error as JSON."""
+    return jsonify(error=exception.description), exception.code
+
+
+@bp.after_request
+def compress(response):
+    """Gzips the response for clients accepting it."""
+    if response.status_code != 200 or response.direct_passthrough or \
+            "Content-Encoding" in response.headers:
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    response.vary.add("Accept-Encoding")
+    if request.accept_encodings["gzip"]:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+if __name__ == "__main__":
+    create_app(bp).run(host="0.0.0.0")
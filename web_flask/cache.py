@@ -0,0 +1,141 @@
+"""Caching for the HBnB Flask applications: HTTP validators letting
+clients and proxies revalidate pages, and a rendered-page cache.
+
+HBNB_CACHE picks the backend ("memory", the default, or "none"),
+HBNB_CACHE_SIZE the number of pages kept (256) and HBNB_CACHE_TTL how
+many seconds a page is served for (60). Another backend, any object
+with get(key) and set(key, value), can be assigned to cache.backend.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timezone
+from functools import wraps
+from os import getenv
+from flask import g, make_response, request
+from werkzeug.http import is_resource_modified
+import models
+
+
+class LRUCache:
+    """in-process cache of the size most recently used entries, each
+    kept for ttl seconds"""
+
+    def __init__(self, size=256, ttl=60.0):
+        """create an empty cache"""
+        self.size = size
+        self.ttl = ttl
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        """return the value cached for key, or None"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.__entries[key]
+                return None
+            self.__entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """cache value for key, evicting the least recently used"""
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + self.ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.size:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        """forget every entry"""
+        with self.__lock:
+            self.__entries.clear()
+
+
+class NullCache:
+    """backend caching nothing"""
+
+    def get(self, key):
+        """return None: nothing is cached"""
+        return None
+
+    def set(self, key, value):
+        """do nothing"""
+
+    def clear(self):
+        """do nothing"""
+
+
+backends = {"memory": LRUCache, "none": NullCache}
+if getenv('HBNB_CACHE', 'memory') == 'memory':
+    backend = LRUCache(int(getenv('HBNB_CACHE_SIZE', '256')),
+                       float(getenv('HBNB_CACHE_TTL', '60')))
+else:
+    backend = backends[getenv('HBNB_CACHE')]()
+
+
+def cached(view):
+    """serve the page rendered by view from the cache
+
+    Pages are keyed by path, query arguments and storage.version,
+    which every storage engine bumps on new(), save(), delete() and
+    on reloading changes, so no page outlives a change made by this
+    process. Under conditional() the key also holds the ETag, which
+    moves with the changes made by other processes; used alone, those
+    are only seen once the TTL expires.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.path, tuple(sorted(request.args.items(multi=True))),
+               models.storage.version, g.get("etag"))
+        page = backend.get(key)
+        if page is None:
+            page = view(*args, **kwargs)
+            if isinstance(page, str):
+                backend.set(key, page)
+        return page
+    return wrapper
+
+
+def conditional(*classes):
+    """answer conditional GETs of a page built from the objects of
+    classes (class names)
+
+    The ETag hashes storage.fingerprint() of each class, their count
+    and latest updated_at, along with the number of changes made to
+    them for the file storage engines, and Last-Modified is the
+    latest updated_at.
+    A request whose If-None-Match or If-Modified-Since still matches
+    gets a 304 before the view queries or renders anything. Deletions
+    do not move Last-Modified, only the ETag, which clients send
+    along and which takes precedence. The ETag is left in g.etag for
+    cached() to key the page with.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            fingerprints = [models.storage.fingerprint(name)
+                            for name in classes]
+            etag = hashlib.sha1(repr(fingerprints).encode()).hexdigest()
+            g.etag = etag
+            latest = [fingerprint[1] for fingerprint in fingerprints
+                      if fingerprint[1] is not None]
+            last_modified = None
+            if latest:
+                last_modified = max(latest).astimezone(timezone.utc)
+            if not is_resource_modified(request.environ, etag=etag,
+                                        last_modified=last_modified):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.cache_control.public = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+"""
+serves the HBnB application with several processes and threads
+
+The master process imports the application and builds the objects of
+models.storage once, then forks the workers, which share the loaded
+objects copy on write and accept connections on the same socket.
+Workers that die are replaced; SIGTERM or SIGINT stops them all, after
+the requests in progress (for up to GRACE seconds).
+
+HBNB_HOST, HBNB_PORT: address to listen on (0.0.0.0, 5000)
+HBNB_WORKERS: worker processes (default: one per CPU)
+HBNB_THREADS: threads answering requests in each worker (4)
+"""
+import gc
+import os
+import signal
+import sys
+import threading
+import time
+from os import getenv
+from werkzeug.serving import make_server
+import models
+from web_flask.wsgi import app
+
+GRACE = 30
+STOP_SIGNALS = {signal.SIGINT, signal.SIGTERM}
+
+
+def answer(server, busy):
+    """accept connections on server and answer their requests"""
+    while True:
+        try:
+            request, client_address = server.get_request()
+        except OSError:
+            if server.socket.fileno() == -1:
+                return
+            # out of file descriptors or the like: wait for some to
+            # be released rather than spin
+            time.sleep(0.1)
+            continue
+        with busy:
+            busy.count += 1
+        try:
+            server.finish_request(request, client_address)
+        except Exception:
+            server.handle_error(request, client_address)
+        finally:
+            server.shutdown_request(request)
+            with busy:
+                busy.count -= 1
+                busy.notify_all()
+
+
+def serve(server, threads):
+    """answer requests with threads threads until a stop signal, then
+    wait for the requests in progress"""
+    stopped = threading.Event()
+    for signum in STOP_SIGNALS:
+        signal.signal(signum, lambda signum, frame: stopped.set())
+    busy = threading.Condition()
+    busy.count = 0
+    for _ in range(threads):
+        threading.Thread(target=answer, args=(server, busy),
+                         daemon=True).start()
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+    while not stopped.wait(1):
+        pass
+    with busy:
+        busy.wait_for(lambda: busy.count == 0, GRACE)
+
+
+def spawn(server, threads, workers):
+    """fork a worker serving server and add its pid to workers"""
+    # the signals wait until the child has its own handlers and the
+    # master knows the pid of the child
+    signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+    pid = os.fork()
+    if pid == 0:
+        serve(server, threads)
+        # a normal exit, running the atexit flushes of the storage
+        sys.exit(0)
+    workers.add(pid)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+
+
+def main():
+    """listen, fork the workers and keep their number up until a stop
+    signal"""
+    host = getenv('HBNB_HOST', '0.0.0.0')
+    port = int(getenv('HBNB_PORT', '5000'))
+    count = int(getenv('HBNB_WORKERS', str(os.cpu_count() or 1)))
+    threads = int(getenv('HBNB_THREADS', '4'))
+    server = make_server(host, port, app)
+    workers = set()
+    stopping = []
+
+    def stop(signum, frame):
+        """stop the workers, and then the master"""
+        stopping.append(signum)
+        for pid in workers:
+            os.kill(pid, signal.SIGTERM)
+
+    for signum in STOP_SIGNALS:
+        signal.signal(signum, stop)
+    models.storage.preload()
+    # objects loaded so far are left alone by the collector, so the
+    # workers do not copy the memory pages holding them
+    gc.freeze()
+    print("Serving on http://{}:{} with {} workers of {} threads".format(
+        host, port, count, threads), flush=True)
+    while True:
+        while not stopping and len(workers) < count:
+            spawn(server, threads, workers)
+        if not workers:
+            break
+        pid, status = os.wait()
+        workers.discard(pid)
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
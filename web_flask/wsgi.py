@@ -0,0 +1,9 @@
+#!/usr/bin/python3
+"""
+WSGI entry point of the HBnB application, serving every route, e.g.
+    python3 -m web_flask.serve
+    gunicorn --preload --workers 4 --threads 4 web_flask.wsgi:app
+"""
+from web_flask import create_app
+
+app = create_app()